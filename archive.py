@@ -0,0 +1,129 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional, gzip is used when it isn't installed
+    zstandard = None
+
+
+CHUNK_SIZE = 64 * 1024
+HEADER_BYTES = 4096
+# Header lines that differ between otherwise identical transcripts; left out
+# of the stored copy so the digest only depends on the conversation
+VOLATILE_HEADERS = (b"Generated: ",)
+
+
+def _plain_chunks(fp, gzipped: bool):
+    decompressor = zlib.decompressobj(wbits=31) if gzipped else None
+    while True:
+        chunk = fp.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        yield decompressor.decompress(chunk) if decompressor else chunk
+    if decompressor:
+        yield decompressor.flush()
+
+
+def _without_volatile_headers(chunks):
+    """Drop VOLATILE_HEADERS lines from the header block (up to the first blank line)"""
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= HEADER_BYTES or b"\n\n" in head:
+            break
+    end = head.find(b"\n\n")
+    end = len(head) if end < 0 else end + 1
+    lines = head[:end].splitlines(keepends=True)
+    yield b"".join(line for line in lines if not line.startswith(VOLATILE_HEADERS)) + head[end:]
+    yield from chunks
+
+
+class TranscriptArchive:
+    """Content-addressed, compressed store of closed-ticket transcripts
+
+    Blobs are named by the SHA-256 of the plain-text transcript, so the same
+    transcript is only ever stored once. The generation time is not part of
+    the stored copy (the close time is in the index). The searchable index (ticket number,
+    channel, creator, type, close time) lives in the ticket database.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.codec = "zst" if zstandard else "gz"
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, digest: str, codec: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.txt.{codec}")
+
+    def _compressor(self, f):
+        if self.codec == "zst":
+            return zstandard.ZstdCompressor(level=10).stream_writer(f, closefd=False)
+        return gzip.GzipFile(fileobj=f, mode="wb", mtime=0)
+
+    async def store(self, fp, gzipped: bool = False, keep_text: int = 0) -> dict:
+        """Archive a transcript buffer, returning its digest, codec and size
+
+        `fp` is read from its current position; set `gzipped` when the buffer
+        holds a gzip stream (TRANSCRIPT_COMPRESS). The caller rewinds it.
+        With `keep_text`, up to that many bytes of plain text are returned as
+        'text' from the same pass (used for the search index).
+        """
+        return await asyncio.to_thread(self._store, fp, gzipped, keep_text)
+
+    def _store(self, fp, gzipped: bool, keep_text: int) -> dict:
+        digest = hashlib.sha256()
+        size = 0
+        kept = []
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                writer = self._compressor(out)
+                for chunk in _without_volatile_headers(_plain_chunks(fp, gzipped)):
+                    digest.update(chunk)
+                    if size < keep_text:
+                        kept.append(chunk[:keep_text - size])
+                    size += len(chunk)
+                    writer.write(chunk)
+                writer.close()
+
+            digest = digest.hexdigest()
+            path = self._path(digest, self.codec)
+            if os.path.exists(path):
+                os.remove(tmp_path)  # Already archived
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        archived = {'digest': digest, 'codec': self.codec, 'size': size}
+        if keep_text:
+            archived['text'] = b"".join(kept).decode("utf-8", errors="ignore")
+        return archived
+
+    async def open(self, digest: str, codec: str, spool_bytes: int):
+        """Decompress an archived transcript into a rewound spooled buffer"""
+        return await asyncio.to_thread(self._open, digest, codec, spool_bytes)
+
+    def _open(self, digest: str, codec: str, spool_bytes: int):
+        buffer = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        with open(self._path(digest, codec), "rb") as f:
+            if codec == "zst":
+                if zstandard is None:
+                    raise RuntimeError("zstandard is required to read this transcript")
+                reader = zstandard.ZstdDecompressor().stream_reader(f)
+            else:
+                reader = gzip.GzipFile(fileobj=f, mode="rb")
+            with reader:
+                shutil.copyfileobj(reader, buffer, CHUNK_SIZE)
+        buffer.seek(0)
+        return buffer
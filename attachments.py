@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+import aiohttp
+
+CHUNK_SIZE = 64 * 1024
+
+
+class TooLarge(Exception):
+    pass
+
+
+def _extension(filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,8}", ext) else ""
+
+
+class AttachmentArchive:
+    """Content-addressed local copies of ticket attachments
+
+    Files are streamed from the CDN in chunks into a temp file while being
+    hashed, then named by their SHA-256, so the same screenshot posted in
+    several tickets is stored once. Downloads share one HTTP session and at
+    most `concurrency` run at a time. Files over `max_bytes` are skipped,
+    from their advertised size or mid-stream if that was wrong, and so is
+    anything past `ticket_max_bytes` per ticket. A download reserves its
+    advertised size from the ticket's budget, which is settled to the bytes
+    actually written once it finishes (nothing for a skip, a failure or a
+    file that was already archived).
+    """
+
+    def __init__(self, directory: str, concurrency: int, max_bytes: int, ticket_max_bytes: int, base_url: str = None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ticket_max_bytes = ticket_max_bytes
+        self.base_url = base_url
+        self._ticket_bytes = {}   # channel id -> bytes reserved or written against its budget
+        self._slots = asyncio.Semaphore(concurrency)
+        self._inflight = {}   # attachment id -> Task, so one file is never fetched twice at once
+        self._session = None
+
+        self.stored = 0
+        self.deduplicated = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_downloaded = 0
+        self.bytes_saved = 0      # downloaded but already on disk
+        self.download_seconds = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def link(self, relative: str) -> str:
+        if self.base_url:
+            return f"{self.base_url.rstrip('/')}/{relative}"
+        return os.path.join(self.directory, relative)
+
+    async def archive(self, channel_id: int, files: list) -> dict:
+        """Archive a ticket's attachment records ({'id', 'filename', 'url', 'size'}), returning {id: link}"""
+        jobs = {}
+        for file in files:
+            task = self._inflight.get(file['id'])
+            if task is None:
+                used = self._ticket_bytes.get(channel_id, 0)
+                if file['size'] > self.max_bytes or used + file['size'] > self.ticket_max_bytes:
+                    self.skipped += 1
+                    continue
+                self._ticket_bytes[channel_id] = used + file['size']
+                task = self._inflight[file['id']] = asyncio.create_task(self._fetch(channel_id, file))
+                task.add_done_callback(lambda _, key=file['id']: self._inflight.pop(key, None))
+            jobs[file['id']] = task
+
+        results = await asyncio.gather(*jobs.values())
+        return {attachment_id: link for attachment_id, link in zip(jobs, results) if link}
+
+    def forget(self, channel_id: int):
+        """Drop a closed ticket's budget"""
+        self._ticket_bytes.pop(channel_id, None)
+
+    def _settle(self, channel_id: int, reserved: int, used: int):
+        """Swap a download's reservation for the bytes it actually wrote"""
+        if channel_id in self._ticket_bytes:
+            self._ticket_bytes[channel_id] = max(0, self._ticket_bytes[channel_id] - reserved + used)
+
+    async def _fetch(self, channel_id: int, file: dict):
+        relative, written = None, 0
+        async with self._slots:
+            started = time.perf_counter()
+            try:
+                relative, written = await self._download(file)
+            except TooLarge:
+                self.skipped += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                self.failed += 1
+                print(f"⚠️ Could not archive attachment {file['filename']}: {e}")
+            finally:
+                self.download_seconds += time.perf_counter() - started
+                self._settle(channel_id, file['size'], written)
+        return self.link(relative) if relative else None
+
+    async def _download(self, file: dict) -> tuple:
+        """(relative path, bytes newly written to the archive; 0 when deduplicated)"""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=300, sock_read=60))
+
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                async with self._session.get(file['url']) as response:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise TooLarge()
+                        digest.update(chunk)
+                        await asyncio.to_thread(out.write, chunk)
+            self.bytes_downloaded += size
+
+            digest = digest.hexdigest()
+            relative = f"{digest[:2]}/{digest}{_extension(file['filename'])}"
+            path = os.path.join(self.directory, relative)
+            if os.path.exists(path):
+                os.remove(tmp_path)  # Same content archived before
+                self.deduplicated += 1
+                self.bytes_saved += size
+                written = 0
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                self.stored += 1
+                written = size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return relative, written
+
+    async def close(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,74 @@
+import discord
+
+
+class StaffDirectory:
+    """Per-guild sets of support-staff user ids, kept current from gateway events
+
+    Answers "is this member staff?" with a set lookup instead of looking up
+    the support role and scanning the member's roles on every interaction.
+    Each guild's set is seeded from its support role's member list and then
+    maintained from member-update, member-remove and role-delete events.
+
+    Without a member cache (lean mode) those events don't arrive, so the
+    roles Discord sends with each interaction are trusted instead.
+    """
+
+    def __init__(self):
+        self._roles = {}      # guild_id -> support role id
+        self._staff = {}      # guild_id -> set of user ids
+        self._complete = set()  # guild_ids seeded from a full member cache
+
+    def members(self, guild_id: int) -> set:
+        return self._staff.get(guild_id, set())
+
+    def complete(self, guild_id: int) -> bool:
+        return guild_id in self._complete
+
+    def configure(self, guild: discord.Guild, role_id: int, member_cache: bool):
+        """(Re)seed a guild's staff set from its support role"""
+        self._roles[guild.id] = role_id
+        role = guild.get_role(role_id) if role_id else None
+        self._staff[guild.id] = {member.id for member in role.members} if role else set()
+        if member_cache and role is not None:
+            self._complete.add(guild.id)
+        else:
+            self._complete.discard(guild.id)
+
+    def update(self, member: discord.Member):
+        """Re-check one member after their roles changed"""
+        role_id = self._roles.get(member.guild.id)
+        if role_id is None:
+            return
+        staff = self._staff.setdefault(member.guild.id, set())
+        if member.get_role(role_id) is not None:
+            staff.add(member.id)
+        else:
+            staff.discard(member.id)
+
+    def remove(self, guild_id: int, user_id: int):
+        self._staff.get(guild_id, set()).discard(user_id)
+
+    def role_deleted(self, guild_id: int, role_id: int):
+        if self._roles.get(guild_id) == role_id:
+            self._staff.get(guild_id, set()).clear()
+
+    def is_staff(self, member: discord.abc.User) -> bool:
+        if not isinstance(member, discord.Member):
+            return False
+        if not self.complete(member.guild.id):
+            self.update(member)
+        return member.id in self._staff.get(member.guild.id, ())
+
+
+def is_authorized(interaction: discord.Interaction, staff: StaffDirectory, ticket: dict = None) -> bool:
+    """Single permission check for ticket actions
+
+    Staff always pass; the ticket creator passes when `ticket` is given;
+    administrators pass last since that check walks the member's roles.
+    """
+    user = interaction.user
+    if staff.is_staff(user):
+        return True
+    if ticket is not None and ticket['user_id'] == user.id:
+        return True
+    return isinstance(user, discord.Member) and user.guild_permissions.administrator
@@ -0,0 +1,259 @@
+"""In-process stand-ins for the discord.py objects the ticket code touches
+
+Only the attributes and coroutines bot.py actually uses are implemented.
+Every call that would hit Discord goes through FakeREST, which adds the
+configured latency and enforces per-route rate limits the way discord.py
+does (waiting out the bucket), counting each wait as a 429.
+"""
+import asyncio
+import datetime
+import itertools
+import random
+import time
+from collections import defaultdict
+
+# Discord snowflakes only need to be unique and increasing here
+_ids = itertools.count(10 ** 17)
+
+def next_id() -> int:
+    return next(_ids)
+
+
+class FakeREST:
+    """Simulated latency and per-route rate limits shared by every fake object"""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, rate_limit: tuple = None, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit    # (requests, per seconds) per route, or None
+        self.random = random.Random(seed)
+        self.calls = defaultdict(int)   # route -> requests made
+        self.rate_limited = 0           # requests that had to wait for their bucket
+        self._windows = {}              # route -> (window start, requests in window)
+        self._locks = defaultdict(asyncio.Lock)
+
+    async def call(self, route: str):
+        self.calls[route] += 1
+        if self.rate_limit:
+            await self._take(route)
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _take(self, route: str):
+        limit, per = self.rate_limit
+        async with self._locks[route]:
+            now = time.monotonic()
+            start, used = self._windows.get(route, (now, 0))
+            if now - start >= per:
+                start, used = now, 0
+            if used >= limit:
+                self.rate_limited += 1
+                await asyncio.sleep(start + per - now)
+                start, used = time.monotonic(), 0
+            self._windows[route] = (start, used + 1)
+
+
+class FakeUser:
+    def __init__(self, name: str = None, user_id: int = None, bot: bool = False):
+        self.id = user_id or next_id()
+        self.name = name or f"user{self.id % 100000}"
+        self.discriminator = "0"
+        self.bot = bot
+        self.roles = []
+        self.guild_permissions = FakePermissions()
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    def get_role(self, role_id: int):
+        return next((role for role in self.roles if role.id == role_id), None)
+
+    def __hash__(self):
+        return self.id
+
+
+class FakePermissions:
+    administrator = False
+
+
+class FakeRole:
+    def __init__(self, role_id: int = None):
+        self.id = role_id or next_id()
+        self.members = []
+
+    @property
+    def mention(self) -> str:
+        return f"<@&{self.id}>"
+
+    def __hash__(self):
+        return self.id
+
+
+class FakeAttachment:
+    def __init__(self, filename: str, size: int = 150_000):
+        self.id = next_id()
+        self.filename = filename
+        self.size = size
+        self.url = f"https://cdn.example.invalid/attachments/{self.id}/{filename}"
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content: str, attachments: list = None):
+        self.id = next_id()
+        self.channel = channel
+        self.author = author
+        self.content = self.clean_content = content
+        self.attachments = attachments or []
+        self.created_at = datetime.datetime.now(datetime.timezone.utc)
+
+
+class FakeTextChannel:
+    def __init__(self, guild, name: str, category=None, overwrites: dict = None):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+        self.category = category
+        self.overwrites = dict(overwrites or {})
+        self.messages = []
+        self.deleted_at = None
+
+    @property
+    def mention(self) -> str:
+        return f"<#{self.id}>"
+
+    async def send(self, content: str = None, **kwargs):
+        await self.guild.rest.call(f"POST /channels/{self.id}/messages")
+        message = FakeMessage(self, self.guild.me, content or "", kwargs.get('attachments'))
+        self.messages.append(message)
+        return message
+
+    async def set_permissions(self, target, **permissions):
+        await self.guild.rest.call(f"PUT /channels/{self.id}/permissions")
+        self.overwrites[target] = permissions
+
+    async def edit(self, **changes):
+        await self.guild.rest.call(f"PATCH /channels/{self.id}")
+        for key, value in changes.items():
+            setattr(self, key, value)
+
+    async def delete(self, reason: str = None):
+        await self.guild.rest.call(f"DELETE /channels/{self.id}")
+        self.guild.channels.pop(self.id, None)
+        self.deleted_at = time.perf_counter()
+
+    async def history(self, limit=None, after=None, oldest_first=False):
+        """Pages of 100 like the real endpoint, one simulated request per page"""
+        start = 0
+        if after is not None:
+            start = next((i for i, m in enumerate(self.messages) if m.id > after.id), len(self.messages))
+        messages = self.messages[start:] if oldest_first else list(reversed(self.messages[start:]))
+        if limit is not None:
+            messages = messages[:limit]
+        for offset in range(0, len(messages), 100):
+            await self.guild.rest.call(f"GET /channels/{self.id}/messages")
+            for message in messages[offset:offset + 100]:
+                yield message
+
+    def seed_messages(self, count: int, authors: list):
+        """Add history without simulated requests (messages sent while the bot was away)"""
+        for i in range(count):
+            attachments = [FakeAttachment(f"evidence-{i}.png")] if i % 50 == 0 else None
+            self.messages.append(FakeMessage(self, authors[i % len(authors)], f"message {i} " + "lorem ipsum " * 8, attachments))
+
+
+class FakeCategory:
+    def __init__(self, guild, name: str):
+        self.id = next_id()
+        self.guild = guild
+        self.name = name
+
+    async def create_text_channel(self, name: str, overwrites: dict = None, **kwargs):
+        await self.guild.rest.call(f"POST /guilds/{self.guild.id}/channels")
+        channel = FakeTextChannel(self.guild, name, category=self, overwrites=overwrites)
+        self.guild.channels[channel.id] = channel
+        return channel
+
+
+class FakeGuild:
+    def __init__(self, rest: FakeREST, name: str = "Benchmark Guild"):
+        self.id = next_id()
+        self.name = name
+        self.rest = rest
+        self.icon = None
+        self.me = FakeUser("ticket-bot", bot=True)
+        self.default_role = FakeRole(self.id)
+        self.channels = {}
+        self.roles = {}
+        self.members = {}
+
+    def add_category(self, name: str) -> FakeCategory:
+        category = FakeCategory(self, name)
+        self.channels[category.id] = category
+        return category
+
+    def add_text_channel(self, name: str) -> FakeTextChannel:
+        channel = FakeTextChannel(self, name)
+        self.channels[channel.id] = channel
+        return channel
+
+    def add_role(self) -> FakeRole:
+        role = FakeRole()
+        self.roles[role.id] = role
+        return role
+
+    def add_member(self, user: FakeUser = None) -> FakeUser:
+        user = user or FakeUser()
+        user.guild = self
+        self.members[user.id] = user
+        return user
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    def get_role(self, role_id: int):
+        return self.roles.get(role_id)
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, **kwargs):
+        await self.interaction.guild.rest.call("POST /interactions/callback")
+        self._done = True
+
+    async def send_message(self, content: str = None, **kwargs):
+        await self.interaction.guild.rest.call("POST /interactions/callback")
+        self._done = True
+        self.interaction.replies.append((time.perf_counter(), content))
+
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content: str = None, **kwargs):
+        await self.interaction.guild.rest.call("POST /webhooks/followup")
+        self.interaction.replies.append((time.perf_counter(), content))
+
+
+class FakeInteraction:
+    """One user's click; replies are timestamped so latency can be measured"""
+
+    def __init__(self, guild: FakeGuild, user: FakeUser, channel=None):
+        self.guild = guild
+        self.user = user
+        self.channel = channel
+        self.created = time.perf_counter()
+        self.replies = []   # (perf_counter, content)
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
@@ -0,0 +1,289 @@
+"""Offline benchmarks for the ticket hot paths
+
+    python -m benchmarks.run                      # every scenario, JSON to stdout
+    python -m benchmarks.run panel_burst --scale 2 --latency 0.1 --rate-limit 5/5
+    python -m benchmarks.run --output new.json --baseline old.json
+
+Each scenario runs in its own process against a throwaway data directory,
+with bot.py driven through the fakes in benchmarks/fakes.py, so peak RSS is
+per scenario and nothing touches Discord.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def percentile(samples: list, q: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(samples: list, seconds: float, rest) -> dict:
+    return {
+        'ops': len(samples),
+        'seconds': round(seconds, 4),
+        'throughput': round(len(samples) / seconds, 2) if seconds else 0.0,
+        'p50_ms': round(percentile(samples, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(samples, 0.99) * 1000, 3),
+        'rest_calls': sum(rest.calls.values()),
+        'rate_limited': rest.rate_limited
+    }
+
+
+# ==================== SCENARIOS ====================
+
+async def setup(args):
+    """Import the bot against a fake guild and return (bot module, fake guild, fake REST)"""
+    import bot
+    from benchmarks.fakes import FakeGuild, FakeREST
+    from guild_settings import GuildSettings
+
+    rest = FakeREST(args.latency, args.jitter, args.rate_limit, seed=args.seed)
+    guild = FakeGuild(rest)
+    categories = {key: guild.add_category(info['name']) for key, info in bot.Config.TICKET_TYPES.items()}
+    support_role = guild.add_role()
+    log_channel = guild.add_text_channel("ticket-logs")
+
+    await bot.ticket_store.load()
+    bot.guild_settings.save(GuildSettings(
+        guild.id,
+        categories={key: category.id for key, category in categories.items()},
+        support_role_id=support_role.id,
+        log_channel_id=log_channel.id
+    ))
+    return bot, guild, rest
+
+
+async def panel_burst(args):
+    """Concurrent panel clicks through create_beautiful_ticket and the creation queue"""
+    bot, guild, rest = await setup(args)
+    from benchmarks.fakes import FakeInteraction
+
+    count = 200 * args.scale
+    types = list(bot.Config.TICKET_TYPES)
+    interactions = [FakeInteraction(guild, guild.add_member()) for _ in range(count)]
+
+    bot.creation_queue.start()
+    started = time.perf_counter()
+
+    async def click(index, interaction):
+        interaction.created = time.perf_counter()
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        await bot.create_beautiful_ticket(interaction, types[index % len(types)])
+
+    await asyncio.gather(*(click(i, interaction) for i, interaction in enumerate(interactions)))
+    # Submitted jobs finish in the queue's workers; wait for every final reply
+    while any(not interaction.replies for interaction in interactions):
+        await asyncio.sleep(0.01)
+    seconds = time.perf_counter() - started
+    bot.creation_queue.stop()
+
+    samples = [interaction.replies[-1][0] - interaction.created for interaction in interactions]
+    result = summarize(samples, seconds, rest)
+    result['created'] = sum(1 for i in interactions if i.replies[-1][1].startswith("✅"))
+    return result
+
+
+async def mass_close(args):
+    """close_stale_tickets() over many open tickets with live transcript logs"""
+    bot, guild, rest = await setup(args)
+
+    count = 100 * args.scale
+    created_at = (datetime.datetime.utcnow() - datetime.timedelta(hours=2)).isoformat()
+    channels = []
+    for i in range(count):
+        user = guild.add_member()
+        channel = guild.add_text_channel(f"ticket-{i:04d}-{user.name}")
+        bot.transcript_log.start(channel.id)
+        channel.seed_messages(40, [user, guild.me])
+        for message in channel.messages:
+            bot.transcript_log.record_message(message)
+        bot.ticket_store.add(channel.id, guild.id, user.id, "general", "GENERAL", created_at, number=i + 1)
+        channels.append(channel)
+    await bot.transcript_log.flush()
+
+    started = time.perf_counter()
+    found, closed = await bot.close_stale_tickets(guild, idle_hours=1, limit=count)
+    seconds = time.perf_counter() - started
+
+    samples = [channel.deleted_at - started for channel in channels if channel.deleted_at]
+    result = summarize(samples, seconds, rest)
+    result.update(found=found, closed=closed)
+    return result
+
+
+async def long_transcript(args):
+    """generate_transcript() on a long channel: cold (history backfill) then warm (log only)"""
+    bot, guild, rest = await setup(args)
+
+    count = 50000 * args.scale
+    user = guild.add_member()
+    channel = guild.add_text_channel("ticket-0001-long")
+    channel.seed_messages(count, [user, guild.add_member(), guild.me])
+    bot.ticket_store.add(channel.id, guild.id, user.id, "general", "GENERAL", datetime.datetime.utcnow().isoformat(), number=1)
+
+    samples = []
+    started = time.perf_counter()
+    for _ in range(1 + args.repeat):
+        op_started = time.perf_counter()
+        transcript = await bot.generate_transcript(channel)
+        samples.append(time.perf_counter() - op_started)
+        transcript.fp.seek(0, os.SEEK_END)
+        size = transcript.fp.tell()
+        transcript.fp.close()
+    seconds = time.perf_counter() - started
+
+    result = summarize(samples, seconds, rest)
+    result.update(messages=count, cold_ms=round(samples[0] * 1000, 3), transcript_bytes=size)
+    return result
+
+
+async def ticket_stats(args):
+    """get_ticket_stats() and the /stats aggregates with thousands of tickets on record"""
+    bot, guild, rest = await setup(args)
+
+    count = 5000 * args.scale
+    types = list(bot.Config.TICKET_TYPES)
+    now = datetime.datetime.utcnow()
+    for i in range(count):
+        created = (now - datetime.timedelta(minutes=7 * i)).isoformat()
+        channel_id = 10 ** 15 + i
+        bot.ticket_store.add(channel_id, guild.id, 10 ** 12 + i, types[i % len(types)], "X", created, number=i + 1)
+        if i % 3:
+            bot.ticket_store.close(channel_id, (now - datetime.timedelta(minutes=7 * i - 90)).isoformat())
+
+    iterations = 2000 * args.scale
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        op_started = time.perf_counter()
+        bot.get_ticket_stats(guild.id)
+        counters = bot.ticket_counters.get(guild.id)
+        counters.last_24h()
+        counters.week_trend()
+        counters.lifetime_percentile(0.5)
+        counters.lifetime_percentile(0.99)
+        samples.append(time.perf_counter() - op_started)
+    seconds = time.perf_counter() - started
+
+    result = summarize(samples, seconds, rest)
+    result['tickets'] = count
+    return result
+
+
+SCENARIOS = {
+    'panel_burst': panel_burst,
+    'mass_close': mass_close,
+    'long_transcript': long_transcript,
+    'ticket_stats': ticket_stats
+}
+
+
+# ==================== RUNNER ====================
+
+def rate_limit(value: str):
+    """'5/5' -> (5 requests, per 5 seconds)"""
+    requests, _, per = value.partition("/")
+    return int(requests), float(per or 1)
+
+
+def run_child(args) -> dict:
+    """Run one scenario in this process (called in a fresh subprocess)"""
+    async def main():
+        result = await SCENARIOS[args.child](args)
+        import bot
+        await bot.transcript_log.flush()
+        await bot.tracer.flush()  # TRACE_SAMPLE_RATE=1 records span trees of the run
+        await bot.ticket_store.shutdown()
+        result['peak_rss_mb'] = round(bot.peak_rss_mb(), 1)
+        return result
+    return asyncio.run(main())
+
+
+def compare(results: dict, baseline: dict):
+    """Print relative change against a previous run for the headline metrics"""
+    for name, result in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before or 'error' in result or 'error' in before:
+            continue
+        changes = []
+        for metric in ('throughput', 'p50_ms', 'p99_ms', 'peak_rss_mb'):
+            if before.get(metric):
+                change = (result[metric] - before[metric]) / before[metric] * 100
+                changes.append(f"{metric} {change:+.1f}%")
+        print(f"{name}: {', '.join(changes)}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ticket bot benchmarks")
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--scale", type=int, default=1, help="multiply every scenario's size")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated REST latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.02, help="extra random latency up to this many seconds")
+    parser.add_argument("--rate-limit", type=rate_limit, help="per-route limit as REQUESTS/SECONDS, e.g. 5/5")
+    parser.add_argument("--repeat", type=int, default=3, help="warm repetitions for long_transcript")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="previous JSON results to compare against")
+    parser.add_argument("--child", choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    if args.child:
+        print(json.dumps(run_child(args)))
+        return
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'scale': args.scale,
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'rate_limit': args.rate_limit
+        },
+        'scenarios': {}
+    }
+
+    passthrough = sys.argv[1:]
+    for name in args.scenarios or SCENARIOS:
+        with tempfile.TemporaryDirectory() as data_dir:
+            env = dict(os.environ, DATA_DIR=data_dir, DATABASE_PATH=os.path.join(data_dir, "tickets.db"))
+            options = [arg for arg in passthrough if arg not in SCENARIOS]
+            process = subprocess.run(
+                [sys.executable, "-m", "benchmarks.run", "--child", name, *options],
+                capture_output=True, text=True, env=env
+            )
+        if process.returncode:
+            results['scenarios'][name] = {'error': process.stderr.strip().splitlines()[-1] if process.stderr else "failed"}
+        else:
+            results['scenarios'][name] = json.loads(process.stdout.strip().splitlines()[-1])
+        print(f"⏱️ {name}: {results['scenarios'][name]}", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,88 +2,416 @@
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
+import argparse
 import datetime
 import asyncio
+import gzip
+import hashlib
+import json
+import logging
 import os
-import random
+import sys
+import tempfile
+import time
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+from archive import TranscriptArchive
+from attachments import AttachmentArchive
+from authz import StaffDirectory, is_authorized
 from config import Config
+from creation import CreationQueue
+from guild_settings import GuildSettings, GuildSettingsStore
+from members import MemberResolver
+from mentions import parse_user_ids
+from metrics import Metrics, serve as serve_metrics
+from presence import PresenceScheduler
+from scheduler import IdleScheduler
+from profiler import SamplingProfiler
+from reconcile import reconcile_guild
+from routing import StaffRouter
+from stats import GuildStats, format_duration
+from search import build_query, searchable_text
+from storage import TicketStore
+from throttle import Throttle
+from tracing import Tracer
+from transcripts import TranscriptLog, attachment_records
 
+# Process start, used to log how long startup takes
+STARTED_AT = time.perf_counter()
 
+# Where app commands are registered: globally for multi-guild deployments,
+# otherwise on the single configured guild (guild commands update instantly)
+COMMAND_GUILD = None if Config.MULTI_GUILD else discord.Object(id=Config.GUILD_ID)
 
+# AutoShardedBot splits the gateway across shards once the bot is in many guilds
+BotBase = commands.AutoShardedBot if Config.SHARDED else commands.Bot
 
-class TicketBot(commands.Bot):
+
+
+class TicketBot(BotBase):
     def __init__(self):
         intents = discord.Intents.default()
-        intents.message_content = True
-        intents.members = True
+        intents.message_content = True  # Needed for transcript content
+        intents.members = not Config.LEAN_CACHE
+        intents.presences = Config.ROUTING_PRESENCES  # Staff online status for ticket routing
         intents.guilds = True
         
-        super().__init__(command_prefix='!', intents=intents)
+        options = {}
+        if Config.LEAN_CACHE:
+            # No member list chunking or caching; members are resolved lazily (see member_resolver)
+            options.update(
+                member_cache_flags=discord.MemberCacheFlags.none(),
+                chunk_guilds_at_startup=False
+            )
+        
+        super().__init__(command_prefix='!', intents=intents, **options)
+        
+        # Set by --sync-commands to push the command tree even if its hash is unchanged
+        self.force_sync = False
+        self.metrics_runner = None
+        # Set by --profile to sample the first seconds after startup
+        self.profile_seconds = 0
         
     async def setup_hook(self):
-        await self.tree.sync(guild=discord.Object(id=Config.GUILD_ID))
-        print(f'✅ Synced commands for guild {Config.GUILD_ID}')
+        restored = await ticket_store.load()
+        print(f'🗄️ Restored {restored} open ticket(s) from {Config.DATABASE_PATH}')
+        if Config.ROUTING_ENABLED:
+            router.restore(ticket_store.open_tickets())
+        
+        await self.sync_commands()
         
         # Start status rotation task
         self.status_task.start()
+        self.transcript_flush_task.start()
+        self.store_flush_task.start()
+        creation_queue.start()
+        idle_scheduler.start()
+        
+        # REST timings and 429s for /metrics
+        metrics.instrument_rest(self.http)
+        logging.getLogger('discord.http').addHandler(metrics.rate_limit_handler())
+        if Config.METRICS_PORT:
+            self.metrics_runner = await serve_metrics(metrics, Config.METRICS_HOST, Config.METRICS_PORT)
+            print(f'📈 Metrics on http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics')
+        
+        if tracer.enabled:
+            print(f'🧵 Tracing {tracer.sample_rate:.0%} of ticket operations to {tracer.path}')
+        if self.profile_seconds:
+            asyncio.create_task(run_profiler(self.profile_seconds))
+    
+    def command_schema_hash(self, guild: discord.abc.Snowflake = None) -> str:
+        """Stable hash of every app command registered for a guild (None = global)"""
+        commands_payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)),
+            key=lambda payload: (payload.get('type', 1), payload['name'])
+        )
+        schema = json.dumps(
+            {'application_id': self.application_id, 'guild_id': guild.id if guild else None, 'commands': commands_payload},
+            sort_keys=True
+        )
+        return hashlib.sha256(schema.encode("utf-8")).hexdigest()
+
+    async def sync_commands(self):
+        """Sync the command tree only when the registered commands changed"""
+        started = time.perf_counter()
+        schema_hash = self.command_schema_hash(COMMAND_GUILD)
+        meta_key = f"command_hash:{COMMAND_GUILD.id if COMMAND_GUILD else 'global'}"
+        scope = f"guild {COMMAND_GUILD.id}" if COMMAND_GUILD else "all guilds"
+        
+        if not self.force_sync and ticket_store.get_meta(meta_key) == schema_hash:
+            print(f'⏭️ Commands unchanged for {scope}, skipped sync ({schema_hash[:12]})')
+            return
+        
+        await self.tree.sync(guild=COMMAND_GUILD)
+        ticket_store.set_meta(meta_key, schema_hash)
+        print(f'✅ Synced commands for {scope} in {time.perf_counter() - started:.2f}s ({schema_hash[:12]})')
+
+    async def close(self):
+        """Flush pending state to disk before disconnecting"""
+        creation_queue.stop()
+        idle_scheduler.stop()
+        await transcript_log.flush()
+        await tracer.flush()
+        if attachment_archive:
+            await attachment_archive.close()
+        await ticket_store.shutdown()
+        if self.metrics_runner:
+            await self.metrics_runner.cleanup()
+        await super().close()
 
     # Status rotation task
-    @tasks.loop(seconds=10)  # Change status every 10 seconds
+    @tasks.loop(seconds=Config.PRESENCE_INTERVAL)
     async def status_task(self):
         await self.change_status()
 
     async def change_status(self):
-        """Change bot status with different messages"""
+        """Rotate bot status, skipping updates that wouldn't change anything"""
         
-        # Get ticket counts
-        total_tickets = len(active_tickets)
+        update = presence.next(ticket_counters.all.open_total, ticket_counters.all.changes)
         
-        # Different status messages
-        status_messages = [
-            f"🎫 {total_tickets} active tickets",
-            "💸 BUY SKIN",
-            "💰 DONATIONS",
-            "🎥 POV",
-            "❓ GENERAL",
-            "❗ REPORT",
-            "✨ Support Online 24/7"
-        ]
+        # Back off while idle, speed up again as soon as tickets move
+        if self.status_task.seconds != presence.interval:
+            self.status_task.change_interval(seconds=presence.interval)
         
-        # Choose random status
-        status = random.choice(status_messages)
+        if update is None:
+            return
         
-        # Set activity
-        await self.change_presence(
-            activity=discord.Game(name=status),
-            status=discord.Status.online  # Can be online, idle, dnd, invisible
-        )
+        activity, status = update
+        await self.change_presence(activity=activity, status=status)
 
     @status_task.before_loop
     async def before_status_task(self):
         """Wait until bot is ready before starting status rotation"""
         await self.wait_until_ready()
 
+    # Write captured ticket messages to disk in batches
+    @tasks.loop(seconds=Config.TRANSCRIPT_FLUSH_SECONDS)
+    async def transcript_flush_task(self):
+        await transcript_log.flush()
+
+    # Write-behind for the ticket store (and finished traces)
+    @tasks.loop(seconds=Config.STORE_FLUSH_SECONDS)
+    async def store_flush_task(self):
+        # An exception here would stop the loop for good, and with it every later write
+        try:
+            await ticket_store.flush()
+            await tracer.flush()
+        except Exception as e:
+            print(f"❌ Periodic flush failed: {e}")
+
 bot = TicketBot()
 
-# Store active tickets
-active_tickets = {}
+# Status rotation, sent only when it changes and within the gateway budget
+presence = PresenceScheduler(
+    rotation=[
+        "🎫 {open} active tickets",
+        "💸 BUY SKIN",
+        "💰 DONATIONS",
+        "🎥 POV",
+        "❓ GENERAL",
+        "❗ REPORT",
+        "✨ Support Online 24/7"
+    ],
+    base_interval=Config.PRESENCE_INTERVAL,
+    max_interval=Config.PRESENCE_MAX_INTERVAL,
+    budget=Config.PRESENCE_BUDGET,
+    window=Config.PRESENCE_BUDGET_WINDOW
+)
+
+# Support staff ids per guild for O(1) permission checks
+staff_directory = StaffDirectory()
+
+# Members resolved on demand (the whole member list is only cached outside lean mode)
+member_resolver = MemberResolver(maxsize=Config.MEMBER_CACHE_SIZE, ttl=Config.MEMBER_CACHE_TTL)
+
+# Incremental counters and time series behind /stats (per guild and bot-wide)
+ticket_counters = GuildStats()
+
+# Durable ticket repository (open tickets are mirrored in memory)
+ticket_store = TicketStore(Config.DATABASE_PATH, stats=ticket_counters, default_guild_id=Config.GUILD_ID)
+
+# Per-guild categories, support role and log channel; the .env values configure GUILD_ID
+guild_settings = GuildSettingsStore(
+    ticket_store,
+    defaults={
+        Config.GUILD_ID: GuildSettings(
+            Config.GUILD_ID,
+            categories={key: Config.get_category_id(key) for key in Config.TICKET_TYPES},
+            support_role_id=Config.SUPPORT_ROLE_ID,
+            log_channel_id=Config.LOG_CHANNEL_ID
+        )
+    },
+    on_load=lambda settings: load_staff(settings)
+)
+
+# Ticket creations are queued and built by a small worker pool
+creation_queue = CreationQueue(
+    maxsize=Config.TICKET_QUEUE_SIZE,
+    workers=Config.TICKET_CREATE_WORKERS,
+    per_guild=Config.TICKET_CREATES_PER_GUILD
+)
+
+# Compressed copies of closed-ticket transcripts (indexed in the ticket store)
+transcript_archive = TranscriptArchive(Config.ARCHIVE_DIR)
+
+# Close jobs in flight, by channel id (one per ticket at a time)
+closing_tickets = {}
+
+# Per-channel locks serialising /add and /remove overwrite rewrites
+member_edit_locks = {}
+
+# Overwrites as left by our last /add or /remove edit, until the gateway
+# channel update brings the cached channel up to date
+member_overwrites = {}
+
+# Capture-mode attachment downloads in flight, per ticket channel
+attachment_tasks = {}
+
+# Guilds whose ticket channels were reconciled with the store since startup
+reconciled_guilds = set()
+
+# Idle reminders and auto-close, driven by per-ticket deadlines
+idle_scheduler = IdleScheduler(
+    ticket_store,
+    remind_after=Config.IDLE_REMIND_HOURS,
+    close_after=Config.IDLE_CLOSE_HOURS,
+    on_remind=lambda ticket: remind_idle_ticket(ticket),
+    on_close=lambda ticket: auto_close_ticket(ticket),
+    ready=lambda: bot.wait_until_ready()
+)
+
+# Live transcript capture for ticket channels
+transcript_log = TranscriptLog(Config.TRANSCRIPT_LOG_DIR)
+
+# Deduplicated local copies of ticket attachments, linked from transcripts (ATTACHMENT_ARCHIVE)
+attachment_archive = AttachmentArchive(
+    Config.ATTACHMENT_DIR,
+    concurrency=Config.ATTACHMENT_CONCURRENCY,
+    max_bytes=Config.ATTACHMENT_MAX_BYTES,
+    ticket_max_bytes=Config.ATTACHMENT_TICKET_MAX_BYTES,
+    base_url=Config.ATTACHMENT_BASE_URL
+) if Config.ATTACHMENT_ARCHIVE else None
+
+# Priority queue of unassigned tickets and least-loaded staff assignment
+router = StaffRouter(
+    ticket_store,
+    priorities={key: rank for rank, key in enumerate(Config.ROUTING_PRIORITY)},
+    max_load=Config.ROUTING_MAX_LOAD,
+    active_window=Config.ROUTING_ACTIVE_MINUTES * 60
+)
+
+# Token buckets per user and per guild for actions that cost REST calls
+throttle = Throttle(Config.THROTTLE_RULES)
+
+# Sampled span trees for ticket create/close (TRACE_SAMPLE_RATE=0 disables)
+tracer = Tracer(Config.TRACE_PATH, Config.TRACE_SAMPLE_RATE, Config.TRACE_FORMAT)
+
+# Handler/REST latency histograms and counters, served on METRICS_PORT
+metrics = Metrics()
+metrics.gauge("ticket_open", "Open tickets across all guilds", lambda: ticket_counters.all.open_total)
+metrics.gauge("ticket_creation_queue_depth", "Ticket creations waiting for a worker", lambda: creation_queue.depth)
+metrics.gauge("ticket_closing", "Close jobs in flight", lambda: len(closing_tickets))
+metrics.gauge("member_cache_size", "Members held by the lean-mode resolver", lambda: len(member_resolver))
+metrics.counter("presence_updates_sent_total", "Presence updates sent since startup", lambda: presence.sent)
+metrics.gauge("ticket_routing_queue_depth", "Tickets waiting for an available staff member", lambda: router.depth())
+if attachment_archive:
+    metrics.counter("attachments_stored_total", "Attachments archived as new files", lambda: attachment_archive.stored)
+    metrics.counter("attachments_deduplicated_total", "Attachments whose content was already archived", lambda: attachment_archive.deduplicated)
+    metrics.counter("attachments_skipped_total", "Attachments over the size caps", lambda: attachment_archive.skipped)
+    metrics.counter("attachments_failed_total", "Attachment downloads that failed", lambda: attachment_archive.failed)
+    metrics.counter("attachment_bytes_downloaded_total", "Bytes downloaded by the attachment archiver", lambda: attachment_archive.bytes_downloaded)
+    metrics.counter("attachment_bytes_saved_total", "Downloaded bytes not stored again thanks to dedup", lambda: attachment_archive.bytes_saved)
+    metrics.counter("attachment_download_seconds_total", "Time spent downloading attachments", lambda: round(attachment_archive.download_seconds, 3))
+metrics.gauge("throttle_buckets", "Token buckets currently tracked by the throttle", lambda: len(throttle))
+metrics.counter("presence_updates_skipped_total", "Presence updates skipped as unchanged or over budget", lambda: presence.skipped)
 
 # ==================== STATUS HELPER FUNCTIONS ====================
 
-def get_ticket_stats():
-    """Get ticket statistics"""
-    total = len(active_tickets)
+def get_ticket_stats(guild_id: int):
+    """Get a guild's ticket statistics (precomputed, no iteration over tickets)"""
+    counters = ticket_counters.get(guild_id)
+    total = counters.open_total
     by_category = {}
     
-    for ticket_id, ticket_data in active_tickets.items():
-        category = ticket_data['category']
-        if category in by_category:
-            by_category[category] += 1
-        else:
-            by_category[category] = 1
+    for ticket_type, count in counters.open_by_type.items():
+        if count and ticket_type in Config.TICKET_TYPES:
+            by_category[Config.TICKET_TYPES[ticket_type]['name']] = count
     
     return total, by_category
 
+# ==================== GUILD HELPER FUNCTIONS ====================
+
+def load_staff(settings: GuildSettings):
+    """Seed a guild's staff set from its support role"""
+    guild = bot.get_guild(settings.guild_id)
+    if guild:
+        staff_directory.configure(guild, settings.support_role_id, member_cache=not Config.LEAN_CACHE)
+
+async def settings_for(guild: discord.abc.Snowflake) -> GuildSettings:
+    return await guild_settings.get(guild.id)
+
+async def authorize(interaction: discord.Interaction, ticket: dict = None) -> bool:
+    """is_authorized() once the guild's staff role is known"""
+    await settings_for(interaction.guild)
+    return is_authorized(interaction, staff_directory, ticket=ticket)
+
+async def throttled(interaction: discord.Interaction, action: str) -> bool:
+    """Reject the interaction with an ephemeral notice if its bucket is empty"""
+    limited = throttle.check(action, interaction.user.id, interaction.guild_id)
+    if limited is None:
+        return False
+    scope, retry_after = limited
+    metrics.throttled.inc(action, scope)
+    who = "This server is" if scope == "guild" else "You're"
+    await interaction.response.send_message(
+        f"⏳ {who} doing that too often - try again in {max(1, round(retry_after))}s.", ephemeral=True
+    )
+    return True
+
+async def route_tickets(guild: discord.Guild, skip: int = None) -> list:
+    """Assign queued tickets to available staff and tell each assignee in their ticket"""
+    if not Config.ROUTING_ENABLED:
+        return []
+    assignments = router.dispatch(guild.id, staff_directory.members(guild.id))
+    for ticket, staff_id in assignments:
+        channel = guild.get_channel(ticket['channel_id'])
+        if channel is None or channel.id == skip:
+            continue
+        try:
+            await channel.send(f"📌 <@{staff_id}> has been assigned to this ticket.")
+        except discord.HTTPException:
+            pass
+    return assignments
+
+def staff_spoke(message: discord.Message):
+    """Availability and time-to-first-response from a staff member's message"""
+    guild_id = message.guild.id
+    router.seen(guild_id, message.author.id)
+    ticket = ticket_store.get(message.channel.id)
+    if ticket is None or message.author.id == ticket['user_id']:
+        return
+    routing = "assigned" if ticket.get('assigned_to') else "role"
+    waited = router.first_response(ticket, message.author.id, message.created_at)
+    if waited is not None:
+        metrics.first_response_seconds.observe(waited, ticket['type'], routing)
+
+def archives_attachments(channel_id: int) -> bool:
+    ticket = ticket_store.get(channel_id)
+    return attachment_archive is not None and ticket is not None and ticket['type'] in Config.ATTACHMENT_TYPES
+
+async def archive_attachments(channel_id: int, files: list):
+    """Download a ticket's attachments and record their links in its transcript log"""
+    archived = await attachment_archive.archive(channel_id, files)
+    for attachment_id, link in archived.items():
+        transcript_log.record_archived(channel_id, attachment_id, link)
+    return archived
+
+async def run_profiler(seconds: float) -> str:
+    """Sample the event loop for `seconds` and write collapsed stacks, returning the file path"""
+    profiler = SamplingProfiler(Config.PROFILE_INTERVAL)
+    print(f'🔬 Profiling for {seconds:g}s...')
+    collapsed = await profiler.run(seconds)
+    
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(Config.PROFILE_DIR, f"profile-{datetime.datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.folded")
+    await asyncio.to_thread(_write_text, path, collapsed)
+    print(f'🔬 {profiler.taken} samples written to {path}')
+    return path
+
+def _write_text(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB (0 where unsupported)"""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
 # ==================== BEAUTIFUL VIEWS ====================
 
 class BeautifulTicketView(discord.ui.View):
@@ -92,21 +420,22 @@ class BeautifulTicketView(discord.ui.View):
         super().__init__(timeout=None)
     
     @discord.ui.button(label="🔒 Close Ticket", style=discord.ButtonStyle.danger, custom_id="close_ticket", row=0)
+    @metrics.instrument("component", "close_button")
     async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.handle_close(interaction)
     
     @discord.ui.button(label="📄 Transcript", style=discord.ButtonStyle.secondary, custom_id="transcript", row=0)
+    @metrics.instrument("component", "transcript_button")
     async def transcript_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if await throttled(interaction, "transcript"):
+            return
         await self.handle_transcript(interaction)
         
     async def handle_close(self, interaction: discord.Interaction):
         channel = interaction.channel
         user = interaction.user
         
-        support_role = interaction.guild.get_role(Config.SUPPORT_ROLE_ID)
-        is_creator = channel.id in active_tickets and active_tickets[channel.id]['user_id'] == user.id
-        
-        if not (support_role in user.roles or is_creator or user.guild_permissions.administrator):
+        if not await authorize(interaction, ticket=ticket_store.get(channel.id)):
             await interaction.response.send_message("❌ You don't have permission to close this ticket!", ephemeral=True)
             return
         
@@ -128,14 +457,16 @@ class BeautifulTicketView(discord.ui.View):
             timestamp=datetime.datetime.utcnow()
         )
         
-        await interaction.followup.send(embed=embed, file=transcript, ephemeral=True)
+        try:
+            await interaction.followup.send(embed=embed, file=transcript, ephemeral=True)
+        finally:
+            transcript.fp.close()
     
     async def handle_add_user(self, interaction: discord.Interaction):
         if not interaction.channel.name.startswith('ticket-'):
             return
         
-        support_role = interaction.guild.get_role(Config.SUPPORT_ROLE_ID)
-        if not (support_role in interaction.user.roles or interaction.user.guild_permissions.administrator):
+        if not await authorize(interaction):
             await interaction.response.send_message("❌ You don't have permission!", ephemeral=True)
             return
         
@@ -146,35 +477,25 @@ class BeautifulTicketView(discord.ui.View):
         if not interaction.channel.name.startswith('ticket-'):
             return
         
-        support_role = interaction.guild.get_role(Config.SUPPORT_ROLE_ID)
-        if not (support_role in interaction.user.roles or interaction.user.guild_permissions.administrator):
+        if not await authorize(interaction):
             await interaction.response.send_message("❌ You don't have permission!", ephemeral=True)
             return
         
         modal = RenameModal()
         await interaction.response.send_modal(modal)
 
-class AddUserModal(discord.ui.Modal, title="👥 Add User to Ticket"):
-    user_id = discord.ui.TextInput(
-        label="User ID or Mention",
-        placeholder="Paste user ID or @mention",
+class AddUserModal(discord.ui.Modal, title="👥 Add Users to Ticket"):
+    user_ids = discord.ui.TextInput(
+        label="User IDs or Mentions",
+        placeholder="Paste one or more user IDs or @mentions",
+        style=discord.TextStyle.paragraph,
         required=True,
-        max_length=50
+        max_length=1000
     )
     
+    @metrics.instrument("modal", "add_user")
     async def on_submit(self, interaction: discord.Interaction):
-        try:
-            user_input = self.user_id.value
-            user_id = ''.join(filter(str.isdigit, user_input))
-            user = await interaction.guild.fetch_member(int(user_id))
-            
-            if user:
-                await interaction.channel.set_permissions(user, read_messages=True, send_messages=True)
-                await interaction.response.send_message(f"✅ Added {user.mention} to the ticket!", ephemeral=True)
-            else:
-                await interaction.response.send_message("❌ User not found!", ephemeral=True)
-        except:
-            await interaction.response.send_message("❌ Invalid user ID or mention!", ephemeral=True)
+        await update_ticket_members(interaction, self.user_ids.value, add=True, ephemeral=True)
 
 class RenameModal(discord.ui.Modal, title="🔧 Rename Ticket"):
     new_name = discord.ui.TextInput(
@@ -184,6 +505,7 @@ class RenameModal(discord.ui.Modal, title="🔧 Rename Ticket"):
         max_length=50
     )
     
+    @metrics.instrument("modal", "rename")
     async def on_submit(self, interaction: discord.Interaction):
         clean_name = self.new_name.value.lower().replace(' ', '-')
         await interaction.channel.edit(name=f"ticket-{clean_name}")
@@ -195,49 +517,33 @@ class ConfirmCloseView(discord.ui.View):
         self.channel = channel
     
     @discord.ui.button(label="✅ Yes, Close", style=discord.ButtonStyle.danger)
+    @metrics.instrument("component", "confirm_close")
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.close_ticket(interaction)
     
     @discord.ui.button(label="❌ Cancel", style=discord.ButtonStyle.secondary)
+    @metrics.instrument("component", "cancel_close")
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.edit_message(content="✅ Closure cancelled.", view=None)
     
     async def close_ticket(self, interaction: discord.Interaction):
-        await interaction.response.edit_message(content="📝 Generating transcript and closing ticket...", view=None)
-        
-        transcript_file = await generate_transcript(self.channel)
-        
-        log_channel = interaction.guild.get_channel(Config.LOG_CHANNEL_ID)
-        if log_channel:
-            embed = discord.Embed(
-                title="🔒 Ticket Closed",
-                color=0xe74c3c,
-                timestamp=datetime.datetime.utcnow()
-            )
-            
-            if self.channel.id in active_tickets:
-                ticket_data = active_tickets[self.channel.id]
-                creator = interaction.guild.get_member(ticket_data['user_id'])
-                ticket_type = Config.TICKET_TYPES[ticket_data['type']]
-                
-                embed.add_field(name="Created By", value=creator.mention if creator else "Unknown", inline=True)
-                embed.add_field(name="Ticket Type", value=f"{ticket_type['emoji']} {ticket_type['name']}", inline=True)
-                embed.add_field(name="Closed By", value=interaction.user.mention, inline=True)
-            
-            await log_channel.send(embed=embed, file=transcript_file)
-        
-        await self.channel.send("🔒 **Ticket closing in 3 seconds...**")
-        await asyncio.sleep(3)
-        await self.channel.delete()
+        # The close runs as a background job so a second confirm can't start another one
+        task = schedule_close(self.channel, closed_by=interaction.user)
+        if task is None:
+            await interaction.response.edit_message(content="⏳ This ticket is already being closed.", view=None)
+            return
         
-        if self.channel.id in active_tickets:
-            del active_tickets[self.channel.id]
+        await interaction.response.edit_message(content="📝 Generating transcript and closing ticket...", view=None)
+        if not await task:
+            await interaction.followup.send("❌ Could not close the ticket, please try again.", ephemeral=True)
 
 class BeautifulTicketSelect(discord.ui.Select):
     """Beautiful dropdown menu for ticket categories"""
-    def __init__(self):
+    def __init__(self, ticket_types: list = None):
         options = []
         for key, value in Config.TICKET_TYPES.items():
+            if ticket_types is not None and key not in ticket_types:
+                continue
             options.append(
                 discord.SelectOption(
                     label=value["name"],
@@ -251,40 +557,197 @@ class BeautifulTicketSelect(discord.ui.Select):
             placeholder="✨ Select a category to create ticket...",
             min_values=1,
             max_values=1,
-            options=options
+            options=options,
+            custom_id="ticket_select"
         )
     
+    @metrics.instrument("component", "ticket_select")
     async def callback(self, interaction: discord.Interaction):
-        await create_beautiful_ticket(interaction, self.values[0])
+        if await throttled(interaction, "ticket_create"):
+            return
+        with tracer.trace("ticket_create", ticket_type=self.values[0], guild=interaction.guild_id):
+            # Answer within the 3-second deadline, the channel is built by the creation queue
+            with tracer.span("defer"):
+                await interaction.response.defer(ephemeral=True, thinking=True)
+            await create_beautiful_ticket(interaction, self.values[0])
 
 class BeautifulSetupView(discord.ui.View):
-    """Beautiful main ticket panel"""
-    def __init__(self):
+    """Beautiful main ticket panel (limited to a guild's enabled ticket types)"""
+    def __init__(self, ticket_types: list = None):
         super().__init__(timeout=None)
-        self.add_item(BeautifulTicketSelect())
+        self.add_item(BeautifulTicketSelect(ticket_types))
 
 # ==================== BOT EVENTS ====================
 
 @bot.event
 async def on_ready():
-    print(f'✨ {bot.user} is now online!')
+    print(f'✨ {bot.user} is now online! (startup took {time.perf_counter() - STARTED_AT:.2f}s)')
     print(f'📊 Serving {len(bot.guilds)} guild(s)')
     print(f'🎫 Ticket categories: {len(Config.TICKET_TYPES)}')
-    print(f'🔄 Status rotation started - changes every 10 seconds')
+    print(f'🔄 Status rotation started - every {Config.PRESENCE_INTERVAL:g}s, backing off to {Config.PRESENCE_MAX_INTERVAL:g}s when idle')
+    
+    # Guilds are brought up concurrently, a few at a time, so one with many
+    # unknown ticket channels doesn't hold up the rest
+    slots = asyncio.Semaphore(Config.RECONCILE_CONCURRENCY)
+    
+    async def prepare(guild: discord.Guild):
+        async with slots:
+            if guild_settings.cached(guild.id):
+                load_staff(guild_settings.cached(guild.id))  # Reconnect: the member cache may have been rebuilt
+            settings = await settings_for(guild)  # First load seeds the staff set via on_load
+            if settings.configured:
+                print(f'🛡️ {guild.name}: {len(staff_directory.members(guild.id))} support staff loaded')
+            else:
+                print(f'⚠️ {guild.name} ({guild.id}) is not configured yet - run /ticket-config')
+            if guild.id not in reconciled_guilds:
+                reconciled_guilds.add(guild.id)
+                await reconcile_tickets(guild, settings)
+            if Config.ROUTING_PRESENCES:
+                for staff_id in staff_directory.members(guild.id):
+                    member = guild.get_member(staff_id)
+                    if member is not None:
+                        router.set_online(guild.id, staff_id, member.status is discord.Status.online)
+            await route_tickets(guild)
+    
+    results = await asyncio.gather(*(prepare(guild) for guild in bot.guilds), return_exceptions=True)
+    for guild, result in zip(bot.guilds, results):
+        if isinstance(result, Exception):
+            print(f"❌ Failed to prepare {guild.name}: {result}")
+    
+    # Compare these between LEAN_CACHE=1 and the full member cache
+    cached_members = sum(len(guild.members) for guild in bot.guilds)
+    print(f'🧠 Cache mode: {"lean" if Config.LEAN_CACHE else "full"} - {cached_members} cached member(s), peak RSS {peak_rss_mb():.1f} MB')
     
     bot.add_view(BeautifulTicketView())
     bot.add_view(BeautifulSetupView())
     
-    # Set initial status
-    await bot.change_presence(
-        activity=discord.Game(name="🎫 Godbattle Support"),
-        status=discord.Status.online
+    # Set initial status (on_ready also fires after reconnects, where a pin must win)
+    if not presence.pinned:
+        activity = discord.Game(name="🎫 Godbattle Support")
+        await bot.change_presence(activity=activity, status=discord.Status.online)
+        presence.mark_sent(activity)
+
+async def reconcile_tickets(guild: discord.Guild, settings: GuildSettings):
+    """Rebuild ticket state from the guild's channels (once per guild per process)"""
+    report = await reconcile_guild(
+        guild, settings, ticket_store, staff_directory.members(guild.id),
+        Config.TICKET_TYPES, Config.RECONCILE_CONCURRENCY
+    )
+    for ticket in report['tickets']:
+        idle_scheduler.schedule(ticket)
+        if Config.ROUTING_ENABLED:
+            router.enqueue(ticket)
+    for channel_id in report['stale']:
+        await transcript_log.discard(channel_id)
+        member_edit_locks.pop(channel_id, None)
+        member_overwrites.pop(channel_id, None)
+        if attachment_archive:
+            attachment_archive.forget(channel_id)
+    print(
+        f"🔁 {guild.name}: reconciled {report['scanned']} ticket channel(s) in {report['seconds']:.2f}s - "
+        f"{report['known']} known, {report['recovered']} recovered ({report['enriched']} via history), "
+        f"{report['unresolved']} unresolved, {report['closed']} stale closed"
     )
 
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    settings = await settings_for(guild)
+    print(f'➕ Joined {guild.name} ({guild.id}) - {"configured" if settings.configured else "run /ticket-config to set it up"}')
+
+@bot.event
+async def on_raw_member_remove(payload: discord.RawMemberRemoveEvent):
+    member_resolver.forget(payload.guild_id, payload.user.id)
+    staff_directory.remove(payload.guild_id, payload.user.id)
+    router.forget(payload.guild_id, payload.user.id)
+    # Their tickets go back into the queue for someone else
+    for ticket in list(ticket_store.open_tickets()):
+        if ticket['guild_id'] == payload.guild_id and ticket.get('assigned_to') == payload.user.id:
+            ticket_store.assign(ticket['channel_id'], None)
+            if Config.ROUTING_ENABLED:
+                router.enqueue(ticket)
+    guild = bot.get_guild(payload.guild_id)
+    if guild is not None:
+        await route_tickets(guild)
+
+@bot.event
+async def on_presence_update(before: discord.Member, after: discord.Member):
+    if before.status == after.status or after.id not in staff_directory.members(after.guild.id):
+        return
+    online = after.status is discord.Status.online
+    router.set_online(after.guild.id, after.id, online)
+    if online and router.depth(after.guild.id):
+        await route_tickets(after.guild)
+
+@bot.event
+async def on_member_update(before: discord.Member, after: discord.Member):
+    if before.roles != after.roles:
+        staff_directory.update(after)
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    staff_directory.role_deleted(role.guild.id, role.id)
+
+def is_captured(channel_id: int) -> bool:
+    return channel_id in ticket_store or transcript_log.tracks(channel_id)
+
+@bot.event
+async def on_message(message: discord.Message):
+    if is_captured(message.channel.id):
+        transcript_log.record_message(message)
+        if not message.author.bot:
+            ticket_store.touch(message.channel.id, message.created_at.replace(tzinfo=None).isoformat())
+            idle_scheduler.activity(message.channel.id)
+        if message.attachments and Config.ATTACHMENT_ARCHIVE == 'capture' and archives_attachments(message.channel.id):
+            task = asyncio.create_task(archive_attachments(message.channel.id, attachment_records(message)))
+            tasks = attachment_tasks.setdefault(message.channel.id, set())
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    
+    # is_staff() re-checks the author's roles when the directory isn't complete
+    # (LEAN_CACHE), so staff who only ever chat are still counted
+    if message.guild is not None and staff_directory.is_staff(message.author):
+        staff_spoke(message)
+        if router.depth(message.guild.id):
+            await route_tickets(message.guild)
+    
+    await bot.process_commands(message)
+
+@bot.event
+async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent):
+    if is_captured(payload.channel_id):
+        transcript_log.record_edit(payload.message)
+
+@bot.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    if is_captured(payload.channel_id):
+        transcript_log.record_delete(payload.channel_id, payload.message_id)
+
+@bot.event
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    if is_captured(payload.channel_id):
+        for message_id in payload.message_ids:
+            transcript_log.record_delete(payload.channel_id, message_id)
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    # Keep the per-user ticket index honest when a ticket channel is deleted by hand
+    member_edit_locks.pop(channel.id, None)
+    member_overwrites.pop(channel.id, None)
+    if ticket_store.close(channel.id, datetime.datetime.utcnow().isoformat()):
+        await transcript_log.discard(channel.id)
+        await route_tickets(channel.guild)
+
+@bot.event
+async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    # The cache has caught up with (at least) our last member edit
+    member_overwrites.pop(after.id, None)
+
 # ==================== BEAUTIFUL COMMANDS ====================
 
-@bot.tree.command(name="setup-ticket", description="Setup beautiful ticket system", guild=discord.Object(id=Config.GUILD_ID))
+@bot.tree.command(name="setup-ticket", description="Setup beautiful ticket system", guild=COMMAND_GUILD)
+@app_commands.guild_only()
 @app_commands.default_permissions(administrator=True)
+@metrics.instrument("command", "setup-ticket")
 async def setup_beautiful_ticket(interaction: discord.Interaction):
     """Create beautiful ticket panel"""
     
@@ -333,14 +796,20 @@ async def setup_beautiful_ticket(interaction: discord.Interaction):
     if interaction.guild.icon:
         embed.set_thumbnail(url=interaction.guild.icon.url)
     
-    await interaction.channel.send(embed=embed, view=BeautifulSetupView())
+    settings = await settings_for(interaction.guild)
+    await interaction.channel.send(embed=embed, view=BeautifulSetupView(settings.enabled_types(Config.TICKET_TYPES)))
     await interaction.response.send_message("✅ Beautiful ticket system installed!", ephemeral=True)
 
-@bot.tree.command(name="stats", description="Show ticket statistics", guild=discord.Object(id=Config.GUILD_ID))
+@bot.tree.command(name="stats", description="Show ticket statistics", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@metrics.instrument("command", "stats")
 async def ticket_stats(interaction: discord.Interaction):
     """Show current ticket statistics"""
+    if await throttled(interaction, "stats"):
+        return
     
-    total, by_category = get_ticket_stats()
+    total, by_category = get_ticket_stats(interaction.guild.id)
+    counters = ticket_counters.get(interaction.guild.id)
     
     embed = discord.Embed(
         title="📊 **Ticket Statistics**",
@@ -358,12 +827,66 @@ async def ticket_stats(interaction: discord.Interaction):
     else:
         embed.add_field(name="📋 By Category", value="No active tickets", inline=False)
     
+    opened_today, closed_today = counters.last_24h()
+    week = counters.week_trend()
+    
+    def trend(current, previous):
+        if not previous:
+            return ""
+        change = (current - previous) / previous * 100
+        return f" ({'📈' if change >= 0 else '📉'} {change:+.0f}%)"
+    
+    embed.add_field(
+        name="📈 Activity",
+        value=(
+            f"• Last 24h: **{opened_today}** opened • **{closed_today}** closed\n"
+            f"• Last 7 days: **{week['opens']}** opened{trend(week['opens'], week['prev_opens'])}"
+            f" • **{week['closes']}** closed{trend(week['closes'], week['prev_closes'])}"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="⏱️ Ticket Lifetime",
+        value=(
+            f"• 7-day average: **{format_duration(week['avg_lifetime'])}**\n"
+            f"• p50 **{format_duration(counters.lifetime_percentile(0.5))}**"
+            f" • p90 **{format_duration(counters.lifetime_percentile(0.9))}**"
+            f" • p99 **{format_duration(counters.lifetime_percentile(0.99))}**"
+        ),
+        inline=False
+    )
+    
+    queue = creation_queue.snapshot()
+    embed.add_field(
+        name="⚙️ Creation Queue",
+        value=(
+            f"• Depth: **{queue['depth']}** (peak {queue['max_depth']})\n"
+            f"• Created: **{queue['processed']}** • Failed: **{queue['failed']}** • Rejected: **{queue['rejected']}**\n"
+            f"• Queued: p50 **{queue['wait_p50']:.2f}s** • Time to channel: p50 **{queue['channel_p50']:.2f}s** • p95 **{queue['channel_p95']:.2f}s**"
+        ),
+        inline=False
+    )
+    
+    embed.add_field(
+        name="🛰️ Presence Updates",
+        value=f"• Sent: **{presence.sent}** • Skipped: **{presence.skipped}**{' • 📌 pinned' if presence.pinned else ''}",
+        inline=False
+    )
+    
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
-@bot.tree.command(name="status", description="Change bot status (Admin only)", guild=discord.Object(id=Config.GUILD_ID))
+@bot.tree.command(name="status", description="Change bot status (Admin only)", guild=COMMAND_GUILD)
+@app_commands.guild_only()
 @app_commands.default_permissions(administrator=True)
-async def change_status(interaction: discord.Interaction, status_type: str, status_text: str):
-    """Change bot status manually"""
+@metrics.instrument("command", "status")
+async def change_status(interaction: discord.Interaction, status_type: str, status_text: str = ""):
+    """Pin a bot status manually, or `release` it back to the rotation"""
+    
+    if status_type.lower() == "release":
+        presence.release()
+        await interaction.response.send_message("✅ Status released back to rotation", ephemeral=True)
+        return
     
     status_types = {
         "playing": discord.Game(name=status_text),
@@ -373,38 +896,87 @@ async def change_status(interaction: discord.Interaction, status_type: str, stat
     }
     
     if status_type.lower() in status_types:
-        await bot.change_presence(activity=status_types[status_type.lower()])
-        await interaction.response.send_message(f"✅ Status changed to **{status_type} {status_text}**", ephemeral=True)
+        activity = status_types[status_type.lower()]
+        presence.pin(activity)
+        await bot.change_presence(activity=activity, status=discord.Status.online)
+        presence.mark_sent(activity)
+        await interaction.response.send_message(f"📌 Status pinned to **{status_type} {status_text}** (use `release` to unpin)", ephemeral=True)
     else:
-        await interaction.response.send_message("❌ Invalid status type! Use: playing, watching, listening, competing", ephemeral=True)
+        await interaction.response.send_message("❌ Invalid status type! Use: playing, watching, listening, competing, release", ephemeral=True)
 
 # ==================== TICKET FUNCTIONS ====================
 
 async def create_beautiful_ticket(interaction: discord.Interaction, ticket_type: str):
-    """Create a beautiful new ticket"""
+    """Validate a (deferred) ticket request and hand it to the creation queue"""
     
     guild = interaction.guild
     user = interaction.user
     
-    category_id = Config.get_category_id(ticket_type)
-    category = guild.get_channel(category_id)
+    with tracer.span("category_lookup"):
+        settings = await settings_for(guild)
+        category = guild.get_channel(settings.category_id(ticket_type))
+    
+    if ticket_type not in settings.enabled_types(Config.TICKET_TYPES):
+        await interaction.followup.send("❌ This ticket type is disabled here.", ephemeral=True)
+        return
     
     if not category:
-        await interaction.response.send_message(
+        await interaction.followup.send(
             "❌ Category not found! Contact admin.",
             ephemeral=True
         )
         return
     
-    for channel in category.channels:
-        if user.name.lower() in channel.name:
-            await interaction.response.send_message(
-                f"❌ You already have a ticket! {channel.mention}",
+    # One ticket per person, across every category
+    existing_id = ticket_store.channel_for_user(guild.id, user.id)
+    if existing_id is not None:
+        existing = guild.get_channel(existing_id)
+        if existing:
+            await interaction.followup.send(
+                f"❌ You already have a ticket! {existing.mention}",
                 ephemeral=True
             )
             return
+        # Channel was deleted while we weren't watching
+        ticket_store.close(existing_id, datetime.datetime.utcnow().isoformat())
+    
+    if not ticket_store.reserve(guild.id, user.id):
+        await interaction.followup.send(
+            "⏳ Your ticket is already being created!",
+            ephemeral=True
+        )
+        return
+    
+    # The job runs in a queue worker; keep the interaction's trace open for it
+    trace = tracer.hold()
+    
+    async def job():
+        with tracer.resume(trace):
+            try:
+                await open_ticket_channel(interaction, ticket_type, category, settings)
+            except Exception:
+                await interaction.followup.send("❌ Could not create your ticket, please try again.", ephemeral=True)
+                raise
+            finally:
+                ticket_store.release(guild.id, user.id)
+    
+    if not creation_queue.submit(guild.id, job):
+        tracer.release(trace)
+        ticket_store.release(guild.id, user.id)
+        await interaction.followup.send(
+            "⏳ Lots of tickets are being opened right now, please try again in a minute.",
+            ephemeral=True
+        )
+
+async def open_ticket_channel(interaction: discord.Interaction, ticket_type: str, category: discord.CategoryChannel,
+                              settings: GuildSettings):
+    """Create the ticket channel, welcome message and store entry"""
     
-    ticket_number = len([c for c in category.channels if c.name.startswith('ticket')]) + 1
+    guild = interaction.guild
+    user = interaction.user
+    
+    # Per-guild, per-type sequence: O(1), persistent, and never reused after deletions
+    ticket_number = await ticket_store.next_number(ticket_store.sequence_name(guild.id, ticket_type))
     channel_name = f"ticket-{ticket_number:04d}-{user.name.lower()}"
     
     overwrites = {
@@ -413,17 +985,39 @@ async def create_beautiful_ticket(interaction: discord.Interaction, ticket_type:
         user: discord.PermissionOverwrite(read_messages=True, send_messages=True)
     }
     
-    support_role = guild.get_role(Config.SUPPORT_ROLE_ID)
+    support_role = guild.get_role(settings.support_role_id)
     if support_role:
         overwrites[support_role] = discord.PermissionOverwrite(read_messages=True, send_messages=True)
     
-    channel = await category.create_text_channel(
-        name=channel_name,
-        overwrites=overwrites
-    )
+    with tracer.span("channel_create"):
+        channel = await category.create_text_channel(
+            name=channel_name,
+            overwrites=overwrites
+        )
+    transcript_log.start(channel.id)
     
     ticket_info = Config.TICKET_TYPES[ticket_type]
     
+    with tracer.span("state_write"):
+        ticket = ticket_store.add(
+            channel.id,
+            guild_id=guild.id,
+            user_id=user.id,
+            ticket_type=ticket_type,
+            category=ticket_info['name'],
+            created_at=datetime.datetime.utcnow().isoformat(),
+            number=ticket_number
+        )
+        idle_scheduler.schedule(ticket)
+    
+    # Hand the ticket to one staff member; the whole role is pinged only when nobody is available
+    assignee = None
+    if Config.ROUTING_ENABLED:
+        with tracer.span("routing"):
+            router.enqueue(ticket)
+            assignments = await route_tickets(guild, skip=channel.id)
+            assignee = next((staff_id for routed, staff_id in assignments if routed is ticket), None)
+    
     welcome_embed = discord.Embed(
         title=f"{ticket_info['emoji']} **{ticket_info['name']} TICKET**",
         description=f"✨ **Welcome {user.mention}!**\n\n{ticket_info['description']}",
@@ -447,7 +1041,7 @@ async def create_beautiful_ticket(interaction: discord.Interaction, ticket_type:
     
     welcome_embed.add_field(
         name="⏱️ **RESPONSE TIME**",
-        value="Support will respond within 5-30 minutes",
+        value=f"Assigned to <@{assignee}>" if assignee else "Support will respond within 5-30 minutes",
         inline=True
     )
     
@@ -462,98 +1056,310 @@ async def create_beautiful_ticket(interaction: discord.Interaction, ticket_type:
         icon_url=guild.icon.url if guild.icon else None
     )
     
-    await channel.send(content=support_role.mention if support_role else "", embed=welcome_embed, view=BeautifulTicketView())
-    
-    active_tickets[channel.id] = {
-        'user_id': user.id,
-        'type': ticket_type,
-        'category': ticket_info['name'],
-        'created_at': datetime.datetime.utcnow().isoformat()
-    }
+    with tracer.span("embed_send"):
+        ping = f"<@{assignee}>" if assignee else (support_role.mention if support_role else "")
+        await channel.send(content=ping, embed=welcome_embed, view=BeautifulTicketView())
     
-    await interaction.response.send_message(
+    await interaction.followup.send(
         f"✅ Ticket created! {channel.mention}",
         ephemeral=True
     )
 
 async def generate_transcript(channel: discord.TextChannel) -> discord.File:
-    """Generate transcript"""
-    messages = []
-    messages.append("=" * 60)
-    messages.append(f"GODBATTLE TICKET TRANSCRIPT")
-    messages.append(f"Channel: {channel.name}")
-    messages.append(f"Generated: {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-    messages.append("=" * 60)
-    messages.append("")
-    
-    if channel.id in active_tickets:
-        ticket_data = active_tickets[channel.id]
-        messages.append(f"Ticket Type: {ticket_data['category']}")
-        messages.append(f"Created By: {ticket_data['user_id']}")
-        messages.append(f"Created At: {ticket_data['created_at']}")
-        messages.append("")
-    
-    async for message in channel.history(limit=None, oldest_first=True):
-        timestamp = message.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        author = f"{message.author.name}#{message.author.discriminator}"
-        content = message.clean_content
-        
-        if message.attachments:
-            content += f" [Attachments: {', '.join([a.filename for a in message.attachments])}]"
-        
-        messages.append(f"[{timestamp}] {author}: {content}")
-    
-    messages.append("")
-    messages.append("=" * 60)
-    messages.append("END OF TRANSCRIPT")
-    messages.append("=" * 60)
+    """Generate transcript from the live capture log, streaming into a spooled buffer"""
+    # Only messages sent while the bot was away are fetched from history
+    with tracer.span("history_backfill"):
+        await transcript_log.backfill(channel)
+        await transcript_log.flush()
+    
+    # Anything not archived during capture (or every attachment in close mode).
+    # Capture downloads still running are awaited and their links flushed
+    # first, so the log read below doesn't treat them as unarchived
+    if archives_attachments(channel.id):
+        with tracer.span("attachment_archive"):
+            capturing = attachment_tasks.pop(channel.id, ())
+            if capturing:
+                await asyncio.gather(*capturing, return_exceptions=True)
+                await transcript_log.flush()
+            files = await asyncio.to_thread(transcript_log.unarchived_files, channel.id)
+            if files and await archive_attachments(channel.id, files):
+                await transcript_log.flush()
+    
+    # Small transcripts stay in memory, large ones roll over to an anonymous
+    # temp file that is removed as soon as the buffer is closed
+    buffer = tempfile.SpooledTemporaryFile(max_size=Config.TRANSCRIPT_SPOOL_BYTES)
+    stream = gzip.GzipFile(fileobj=buffer, mode="wb", mtime=0) if Config.TRANSCRIPT_COMPRESS else buffer
+    
+    def write(line: str = ""):
+        stream.write(line.encode("utf-8") + b"\n")
+    
+    write("=" * 60)
+    write(f"GODBATTLE TICKET TRANSCRIPT")
+    write(f"Channel: {channel.name}")
+    write(f"Generated: {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    write("=" * 60)
+    write()
+    
+    ticket_data = ticket_store.get(channel.id)
+    if ticket_data:
+        write(f"Ticket Type: {ticket_data['category']}")
+        write(f"Created By: {ticket_data['user_id']}")
+        write(f"Created At: {ticket_data['created_at']}")
+        write()
+    
+    with tracer.span("transcript_encode"):
+        await asyncio.to_thread(transcript_log.render, channel.id, write)
+    
+    write()
+    write("=" * 60)
+    write("END OF TRANSCRIPT")
+    write("=" * 60)
+    
+    if stream is not buffer:
+        stream.close()
+    buffer.seek(0)
     
     filename = f"transcript-{channel.name}-{datetime.datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.txt"
-    with open(filename, "w", encoding="utf-8") as f:
-        f.write("\n".join(messages))
+    if Config.TRANSCRIPT_COMPRESS:
+        filename += ".gz"
     
-    return discord.File(filename)
+    return discord.File(buffer, filename=filename)
+
+def schedule_close(channel: discord.TextChannel, closed_by: discord.abc.User = None, reason: str = None, delay: float = 3):
+    """Start the close job for a ticket, or return None if it is already closing"""
+    if channel.id in closing_tickets:
+        return None
+    
+    task = asyncio.create_task(close_ticket_job(channel, closed_by, reason, delay))
+    closing_tickets[channel.id] = task
+    task.add_done_callback(lambda _: closing_tickets.pop(channel.id, None))
+    return task
+
+async def close_ticket_job(channel: discord.TextChannel, closed_by: discord.abc.User = None, reason: str = None, delay: float = 3):
+    """Transcript, archive, log and delete a ticket channel, returning whether it closed"""
+    with tracer.trace("ticket_close", channel=channel.id, reason=reason):
+        try:
+            transcript_file = await generate_transcript(channel)
+            ticket_data = ticket_store.get(channel.id)
+            closed_by_id = closed_by.id if closed_by else None
+            
+            # Keep a compressed local copy so it can be fetched again once the channel is gone
+            with tracer.span("archive_store"):
+                archived = await transcript_archive.store(
+                    transcript_file.fp,
+                    gzipped=Config.TRANSCRIPT_COMPRESS,
+                    keep_text=Config.SEARCH_MAX_BYTES
+                )
+            transcript_file.fp.seek(0)
+            
+            try:
+                settings = await settings_for(channel.guild)
+                log_channel = channel.guild.get_channel(settings.log_channel_id)
+                if log_channel:
+                    embed = discord.Embed(
+                        title="🔒 Ticket Closed",
+                        color=0xe74c3c,
+                        timestamp=datetime.datetime.utcnow()
+                    )
+                    
+                    if ticket_data:
+                        creator = member_resolver.get(channel.guild, ticket_data['user_id'])
+                        ticket_type = Config.TICKET_TYPES[ticket_data['type']]
+                        
+                        embed.add_field(name="Created By", value=creator.mention if creator else f"<@{ticket_data['user_id']}>", inline=True)
+                        embed.add_field(name="Ticket Type", value=f"{ticket_type['emoji']} {ticket_type['name']}", inline=True)
+                        embed.add_field(name="Closed By", value=closed_by.mention if closed_by else "🤖 Automatic", inline=True)
+                    
+                    if reason:
+                        embed.add_field(name="Reason", value=reason, inline=False)
+                    
+                    embed.set_footer(text=f"Archived as {archived['digest'][:12]} • /transcript to fetch again")
+                    
+                    with tracer.span("log_upload", bytes=archived['size']):
+                        await log_channel.send(embed=embed, file=transcript_file)
+            finally:
+                transcript_file.fp.close()
+            
+            # Indexed only once the log copy is posted, so a close that failed before
+            # that and is retried doesn't leave a second entry behind
+            ticket_store.add_transcript(
+                archived, ticket_data, channel.guild.id, channel.id,
+                closed_at=datetime.datetime.utcnow().isoformat(),
+                closed_by=closed_by_id,
+                text=searchable_text(archived['text'])
+            )
+            
+            if delay:
+                await channel.send(f"🔒 **Ticket closing in {delay:g} seconds...**")
+                await asyncio.sleep(delay)
+            
+            # Close in the store first so the channel delete event sees nothing to clean up
+            ticket_store.close(channel.id, datetime.datetime.utcnow().isoformat(), closed_by=closed_by_id)
+            with tracer.span("delete"):
+                try:
+                    await channel.delete(reason=reason)
+                except discord.NotFound:
+                    pass
+            await transcript_log.discard(channel.id)
+            member_edit_locks.pop(channel.id, None)
+            member_overwrites.pop(channel.id, None)
+            if attachment_archive:
+                attachment_archive.forget(channel.id)
+            # The closer's load just dropped, so a queued ticket may fit now
+            await route_tickets(channel.guild)
+            return True
+        except Exception as e:
+            print(f"❌ Failed to close {channel.name}: {e}")
+            return False
+
+async def close_stale_tickets(guild: discord.Guild, idle_hours: float, limit: int):
+    """Close up to `limit` tickets idle for `idle_hours`, a few at a time"""
+    cutoff = (datetime.datetime.utcnow() - datetime.timedelta(hours=idle_hours)).isoformat()
+    stale = ticket_store.idle_tickets(guild.id, before=cutoff, limit=limit)
+    slots = asyncio.Semaphore(Config.BULK_CLOSE_CONCURRENCY)
+    reason = f"Idle for over {idle_hours:g}h"
+    
+    async def close_one(ticket):
+        channel = guild.get_channel(ticket['channel_id'])
+        if channel is None:
+            # Already gone, just forget it
+            ticket_store.close(ticket['channel_id'], datetime.datetime.utcnow().isoformat())
+            return True
+        
+        async with slots:
+            task = schedule_close(channel, reason=reason, delay=0)
+            if task is None:
+                return False
+            return await task
+    
+    results = await asyncio.gather(*(close_one(t) for t in stale), return_exceptions=True)
+    closed = sum(1 for r in results if r is True)
+    return len(stale), closed
+
+async def ticket_channel(ticket: dict):
+    """The ticket's channel, fetched if it isn't cached; None (and the ticket closed) only if Discord says it's gone"""
+    channel = bot.get_channel(ticket['channel_id'])
+    if channel is not None:
+        return channel
+    try:
+        return await bot.fetch_channel(ticket['channel_id'])
+    except discord.NotFound:
+        ticket_store.close(ticket['channel_id'], datetime.datetime.utcnow().isoformat())
+        await transcript_log.discard(ticket['channel_id'])
+        return None
+
+async def remind_idle_ticket(ticket: dict) -> bool:
+    """Nudge a quiet ticket before it gets auto-closed, returning whether the reminder was posted"""
+    channel = await ticket_channel(ticket)
+    if channel is None:
+        return False
+    
+    remaining = Config.IDLE_CLOSE_HOURS - Config.IDLE_REMIND_HOURS
+    closing = f" It will be closed automatically in **{remaining:g}h** without a reply." if Config.IDLE_CLOSE_HOURS else ""
+    await channel.send(f"⏰ <@{ticket['user_id']}> this ticket has been quiet for **{Config.IDLE_REMIND_HOURS:g}h**.{closing}")
+    return True
+
+async def auto_close_ticket(ticket: dict) -> bool:
+    """Close an idle ticket through the normal transcript path"""
+    channel = await ticket_channel(ticket)
+    if channel is None:
+        return True  # Already gone, nothing left to close
+    
+    task = schedule_close(channel, reason=f"Auto-closed after {Config.IDLE_CLOSE_HOURS:g}h without activity")
+    if task is not None:
+        # A close job that fails leaves the ticket open, so try again later
+        task.add_done_callback(lambda t: t.cancelled() or t.result() or idle_scheduler.retry(ticket))
+    return True
 
 # ==================== COMMANDS ====================
 
-@bot.tree.command(name="add", description="Add user to ticket", guild=discord.Object(id=Config.GUILD_ID))
-async def add_user(interaction: discord.Interaction, user: discord.Member):
+async def update_ticket_members(interaction: discord.Interaction, text: str, add: bool, ephemeral: bool = False):
+    """Add or remove every user mentioned in `text` with a single channel edit"""
+    user_ids = parse_user_ids(text)[:Config.TICKET_MEMBERS_MAX]
+    if not user_ids:
+        await interaction.response.send_message("❌ No user IDs or mentions found!", ephemeral=True)
+        return
+    
+    guild = interaction.guild
+    channel = interaction.channel
+    # The edit (and any member fetches) may queue behind the lock or a rate limit
+    await interaction.response.defer(ephemeral=ephemeral)
+    
+    # The edit replaces every overwrite, so concurrent updates to one channel take turns and
+    # start from what the previous one wrote (the cache only catches up when the gateway
+    # update arrives)
+    async with member_edit_locks.setdefault(channel.id, asyncio.Lock()):
+        # Keyed by id: lean mode can list an uncached member as an Object
+        overwrites = dict(member_overwrites.get(channel.id) or {
+            target.id: (target, overwrite) for target, overwrite in channel.overwrites.items()
+        })
+        if add:
+            changed, missing = await member_resolver.resolve_many(guild, user_ids)
+            for member in changed:
+                overwrites[member.id] = (member, discord.PermissionOverwrite(read_messages=True, send_messages=True))
+        else:
+            # Removal works on the existing member overwrites, no member lookup needed
+            targets = {
+                target_id: target for target_id, (target, _) in overwrites.items()
+                if not isinstance(target, discord.Role) and getattr(target, 'type', None) is not discord.Role
+            }
+            changed = [targets[user_id] for user_id in user_ids if user_id in targets and user_id != guild.me.id]
+            missing = [user_id for user_id in user_ids if user_id not in targets]
+            for target in changed:
+                del overwrites[target.id]
+        
+        if changed:
+            await channel.edit(overwrites=dict(overwrites.values()))
+            member_overwrites[channel.id] = overwrites
+    
+    lines = []
+    if changed:
+        mentions = ", ".join(f"<@{target.id}>" for target in changed)
+        lines.append(f"✅ {'Added' if add else 'Removed'} {mentions}!")
+    if missing:
+        reason = "not found in this server" if add else "not in this ticket"
+        lines.append(f"⚠️ {', '.join(f'<@{user_id}>' for user_id in missing)} {reason}")
+    await interaction.followup.send("\n".join(lines), ephemeral=ephemeral)
+
+@bot.tree.command(name="add", description="Add users to ticket", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@app_commands.describe(users="One or more @mentions or user IDs")
+@metrics.instrument("command", "add")
+async def add_user(interaction: discord.Interaction, users: str):
     if not interaction.channel.name.startswith('ticket-'):
         await interaction.response.send_message("❌ Ticket channel only!", ephemeral=True)
         return
     
-    support_role = interaction.guild.get_role(Config.SUPPORT_ROLE_ID)
-    if not (support_role in interaction.user.roles or interaction.user.guild_permissions.administrator):
+    if not await authorize(interaction):
         await interaction.response.send_message("❌ No permission!", ephemeral=True)
         return
     
-    await interaction.channel.set_permissions(user, read_messages=True, send_messages=True)
-    await interaction.response.send_message(f"✅ Added {user.mention}!")
+    await update_ticket_members(interaction, users, add=True)
 
-@bot.tree.command(name="remove", description="Remove user from ticket", guild=discord.Object(id=Config.GUILD_ID))
-async def remove_user(interaction: discord.Interaction, user: discord.Member):
+@bot.tree.command(name="remove", description="Remove users from ticket", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@app_commands.describe(users="One or more @mentions or user IDs")
+@metrics.instrument("command", "remove")
+async def remove_user(interaction: discord.Interaction, users: str):
     if not interaction.channel.name.startswith('ticket-'):
         await interaction.response.send_message("❌ Ticket channel only!", ephemeral=True)
         return
     
-    support_role = interaction.guild.get_role(Config.SUPPORT_ROLE_ID)
-    if not (support_role in interaction.user.roles or interaction.user.guild_permissions.administrator):
+    if not await authorize(interaction):
         await interaction.response.send_message("❌ No permission!", ephemeral=True)
         return
     
-    await interaction.channel.set_permissions(user, overwrite=None)
-    await interaction.response.send_message(f"✅ Removed {user.mention}!")
+    await update_ticket_members(interaction, users, add=False)
 
-@bot.tree.command(name="close", description="Close current ticket", guild=discord.Object(id=Config.GUILD_ID))
+@bot.tree.command(name="close", description="Close current ticket", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@metrics.instrument("command", "close")
 async def close_command(interaction: discord.Interaction):
     if not interaction.channel.name.startswith('ticket-'):
         await interaction.response.send_message("❌ Ticket channel only!", ephemeral=True)
         return
     
-    support_role = interaction.guild.get_role(Config.SUPPORT_ROLE_ID)
-    is_creator = interaction.channel.id in active_tickets and active_tickets[interaction.channel.id]['user_id'] == interaction.user.id
-    
-    if not (support_role in interaction.user.roles or is_creator or interaction.user.guild_permissions.administrator):
+    if not await authorize(interaction, ticket=ticket_store.get(interaction.channel.id)):
         await interaction.response.send_message("❌ No permission!", ephemeral=True)
         return
     
@@ -564,23 +1370,245 @@ async def close_command(interaction: discord.Interaction):
         ephemeral=True
     )
 
+@bot.tree.command(name="transcript", description="Fetch an archived ticket transcript", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@app_commands.describe(
+    ticket_number="Ticket number, e.g. 42",
+    ticket_type="Ticket type (numbers are per type)",
+    creator="User who opened the ticket",
+    channel_id="ID of the closed ticket channel"
+)
+@app_commands.choices(ticket_type=[
+    app_commands.Choice(name=info['name'], value=key) for key, info in Config.TICKET_TYPES.items()
+])
+@metrics.instrument("command", "transcript")
+async def fetch_transcript(interaction: discord.Interaction, ticket_number: int = None, ticket_type: str = None,
+                           creator: discord.User = None, channel_id: str = None):
+    if not await authorize(interaction):
+        await interaction.response.send_message("❌ No permission!", ephemeral=True)
+        return
+    
+    if ticket_number is None and creator is None and not (channel_id and channel_id.isdigit()):
+        await interaction.response.send_message("❌ Give a ticket number, creator or channel ID!", ephemeral=True)
+        return
+    
+    await interaction.response.defer(ephemeral=True)
+    
+    matches = await ticket_store.find_transcripts(
+        interaction.guild.id,
+        number=ticket_number,
+        ticket_type=ticket_type,
+        channel_id=int(channel_id) if channel_id and channel_id.isdigit() else None,
+        creator_id=creator.id if creator else None
+    )
+    
+    if not matches:
+        await interaction.followup.send("❌ No archived transcript found!", ephemeral=True)
+        return
+    
+    record = matches[0]
+    ticket_info = Config.TICKET_TYPES.get(record['type'] or "", {"emoji": "🎫", "name": "UNKNOWN"})
+    
+    embed = discord.Embed(
+        title="📄 Archived Transcript",
+        color=0x3498db,
+        timestamp=datetime.datetime.utcnow()
+    )
+    embed.add_field(name="Ticket", value=f"{ticket_info['emoji']} {ticket_info['name']} #{(record['ticket_number'] or 0):04d}", inline=True)
+    embed.add_field(name="Created By", value=f"<@{record['creator_id']}>" if record['creator_id'] else "Unknown", inline=True)
+    embed.add_field(name="Closed", value=record['closed_at'][:16].replace('T', ' ') + " UTC", inline=True)
+    
+    if len(matches) > 1:
+        others = "\n".join(
+            f"• #{(m['ticket_number'] or 0):04d} {m['type'] or '?'} — closed {m['closed_at'][:10]} (channel `{m['channel_id']}`)"
+            for m in matches[1:]
+        )
+        embed.add_field(name="Other matches", value=others, inline=False)
+    
+    buffer = await transcript_archive.open(record['digest'], record['codec'], Config.TRANSCRIPT_SPOOL_BYTES)
+    try:
+        filename = f"transcript-{record['type'] or 'ticket'}-{(record['ticket_number'] or 0):04d}.txt"
+        await interaction.followup.send(embed=embed, file=discord.File(buffer, filename=filename), ephemeral=True)
+    finally:
+        buffer.close()
+
+@bot.tree.command(name="ticket-search", description="Search archived ticket transcripts", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@app_commands.describe(
+    query="Words to look for, e.g. a player name (end a word with * for prefix match)",
+    ticket_type="Only search one ticket type",
+    page="Result page"
+)
+@app_commands.choices(ticket_type=[
+    app_commands.Choice(name=info['name'], value=key) for key, info in Config.TICKET_TYPES.items()
+])
+@metrics.instrument("command", "ticket-search")
+async def search_transcripts(interaction: discord.Interaction, query: str, ticket_type: str = None,
+                             page: app_commands.Range[int, 1] = 1):
+    if not await authorize(interaction):
+        await interaction.response.send_message("❌ No permission!", ephemeral=True)
+        return
+    if await throttled(interaction, "search"):
+        return
+    
+    if not ticket_store.search_enabled:
+        await interaction.response.send_message("❌ Transcript search is not available on this host!", ephemeral=True)
+        return
+    
+    match = build_query(query)
+    if match is None:
+        await interaction.response.send_message("❌ Nothing to search for!", ephemeral=True)
+        return
+    
+    await interaction.response.defer(ephemeral=True)
+    
+    per_page = Config.SEARCH_PAGE_SIZE
+    total, results = await ticket_store.search_transcripts(
+        match, interaction.guild.id, ticket_type=ticket_type, limit=per_page, offset=(page - 1) * per_page
+    )
+    pages = max(1, -(-total // per_page))
+    
+    embed = discord.Embed(
+        title=f"🔎 Transcript search: {query[:100]}",
+        color=0x3498db,
+        timestamp=datetime.datetime.utcnow()
+    )
+    
+    if results:
+        lines = []
+        for rank, result in enumerate(results, start=(page - 1) * per_page + 1):
+            ticket_info = Config.TICKET_TYPES.get(result['type'] or "", {"emoji": "🎫", "name": "UNKNOWN"})
+            creator = f"<@{result['creator_id']}>" if result['creator_id'] else "Unknown"
+            lines.append(
+                f"**{rank}.** {ticket_info['emoji']} {ticket_info['name']} #{(result['ticket_number'] or 0):04d}"
+                f" • {creator} • closed {result['closed_at'][:10]} • channel `{result['channel_id']}`"
+            )
+        embed.description = "\n".join(lines)
+    else:
+        embed.description = "No matching transcripts."
+    
+    embed.set_footer(text=f"Page {min(page, pages)}/{pages} • {total} match(es) • /transcript channel_id:<id> to open one")
+    await interaction.followup.send(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="close-stale", description="Close tickets with no activity (Admin only)", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@app_commands.default_permissions(administrator=True)
+@app_commands.describe(idle_hours="Close tickets idle for at least this many hours", limit="Maximum tickets to close")
+@metrics.instrument("command", "close-stale")
+async def close_stale_command(interaction: discord.Interaction, idle_hours: app_commands.Range[float, 1],
+                              limit: app_commands.Range[int, 1, 500] = 50):
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    
+    started = time.perf_counter()
+    found, closed = await close_stale_tickets(interaction.guild, idle_hours, limit)
+    elapsed = time.perf_counter() - started
+    
+    await interaction.followup.send(
+        f"🧹 Closed **{closed}/{found}** ticket(s) idle for over {idle_hours:g}h in {elapsed:.1f}s",
+        ephemeral=True
+    )
+
+@bot.tree.command(name="ticket-config", description="Configure tickets for this server (Admin only)", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@app_commands.default_permissions(administrator=True)
+@app_commands.describe(
+    ticket_type="Ticket type the category / enabled options apply to",
+    category="Category new tickets of this type are created in",
+    enabled="Offer this ticket type in the panel",
+    support_role="Role that can see and manage every ticket",
+    log_channel="Channel closed-ticket transcripts are posted to"
+)
+@app_commands.choices(ticket_type=[
+    app_commands.Choice(name=info['name'], value=key) for key, info in Config.TICKET_TYPES.items()
+])
+@metrics.instrument("command", "ticket-config")
+async def ticket_config(interaction: discord.Interaction, ticket_type: str = None,
+                        category: discord.CategoryChannel = None, enabled: bool = None,
+                        support_role: discord.Role = None, log_channel: discord.TextChannel = None):
+    """Show or change this guild's ticket settings"""
+    if (category is not None or enabled is not None) and ticket_type is None:
+        await interaction.response.send_message("❌ Pick the ticket type to change!", ephemeral=True)
+        return
+    
+    current = await settings_for(interaction.guild)
+    settings = GuildSettings.from_dict(interaction.guild.id, current.to_dict())
+    
+    if category is not None:
+        settings.categories[ticket_type] = category.id
+    if enabled is not None:
+        types = settings.enabled_types(Config.TICKET_TYPES)
+        if enabled and ticket_type not in types:
+            types.append(ticket_type)
+        elif not enabled and ticket_type in types:
+            types.remove(ticket_type)
+        settings.ticket_types = types
+    if support_role is not None:
+        settings.support_role_id = support_role.id
+    if log_channel is not None:
+        settings.log_channel_id = log_channel.id
+    
+    changed = settings.to_dict() != current.to_dict()
+    if changed:
+        guild_settings.save(settings)
+        if settings.support_role_id != current.support_role_id:
+            load_staff(settings)
+    
+    lines = []
+    for key, info in Config.TICKET_TYPES.items():
+        category_id = settings.category_id(key)
+        state = "✅" if key in settings.enabled_types(Config.TICKET_TYPES) else "🚫"
+        lines.append(f"{state} {info['emoji']} {info['name']}: {f'<#{category_id}>' if category_id else '*no category*'}")
+    
+    embed = discord.Embed(
+        title="⚙️ Ticket Settings" + (" (updated)" if changed else ""),
+        description="\n".join(lines),
+        color=0x3498db,
+        timestamp=datetime.datetime.utcnow()
+    )
+    embed.add_field(name="Support Role", value=f"<@&{settings.support_role_id}>" if settings.support_role_id else "Not set", inline=True)
+    embed.add_field(name="Log Channel", value=f"<#{settings.log_channel_id}>" if settings.log_channel_id else "Not set", inline=True)
+    if changed and ticket_type is not None:
+        embed.set_footer(text="Re-run /setup-ticket to refresh the panel's ticket types")
+    
+    await interaction.response.send_message(embed=embed, ephemeral=True)
+
+@bot.tree.command(name="debug-profile", description="Profile the bot for a while (Bot owner only)", guild=COMMAND_GUILD)
+@app_commands.guild_only()
+@app_commands.default_permissions(administrator=True)
+@app_commands.describe(seconds="How long to sample")
+@metrics.instrument("command", "debug-profile")
+async def debug_profile(interaction: discord.Interaction, seconds: app_commands.Range[int, 5, 300] = 30):
+    if not await bot.is_owner(interaction.user):
+        await interaction.response.send_message("❌ Bot owner only!", ephemeral=True)
+        return
+    
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    path = await run_profiler(seconds)
+    await interaction.followup.send(
+        f"🔬 Collapsed stacks for {seconds}s (open with speedscope or flamegraph.pl)",
+        file=discord.File(path),
+        ephemeral=True
+    )
+
 # ==================== RUN BOT ====================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Godbattle ticket bot")
+    parser.add_argument("--sync-commands", action="store_true", help="sync app commands even if they look unchanged")
+    parser.add_argument("--profile", type=float, default=0, metavar="SECONDS", help="sample the first SECONDS after startup")
+    args = parser.parse_args()
+    bot.force_sync = args.sync_commands
+    bot.profile_seconds = args.profile
+    
     if not Config.TOKEN:
         print("❌ No token found!")
         exit(1)
     
     print("✨ Starting Godbattle Ticket Bot...")
     print("🎨 Beautiful UI Edition")
-    print("🔄 Status rotation: Active (changes every 10 seconds)")
+    print(f"🔄 Status rotation: Active (every {Config.PRESENCE_INTERVAL:g}s, adaptive)")
     
     try:
         bot.run(Config.TOKEN)
     except Exception as e:
         print(f"❌ Error: {e}")
-
-#class running(WorkerEntrypoint)
-#async def fetch(self, request):
-#        return Response("Hello World!")
-#        
\ No newline at end of file
@@ -17,6 +17,102 @@ class Config:
     SUPPORT_ROLE_ID = int(os.getenv('SUPPORT_ROLE_ID', 0))
     LOG_CHANNEL_ID = int(os.getenv('LOG_CHANNEL_ID', 0))
     
+    # Transcripts are streamed into a spooled buffer; anything larger than
+    # this many bytes spills to an anonymous temp file instead of memory
+    TRANSCRIPT_SPOOL_BYTES = int(os.getenv('TRANSCRIPT_SPOOL_BYTES', 1024 * 1024))
+    TRANSCRIPT_COMPRESS = os.getenv('TRANSCRIPT_COMPRESS', '0') == '1'
+    
+    # Ticket creation queue (burst handling)
+    TICKET_QUEUE_SIZE = int(os.getenv('TICKET_QUEUE_SIZE', 200))
+    TICKET_CREATE_WORKERS = int(os.getenv('TICKET_CREATE_WORKERS', 4))
+    TICKET_CREATES_PER_GUILD = int(os.getenv('TICKET_CREATES_PER_GUILD', 2))
+    
+    # Idle tickets: remind after this many hours of silence, auto-close after this many (0 disables;
+    # auto-close deletes channels, so it is off unless set)
+    IDLE_REMIND_HOURS = float(os.getenv('IDLE_REMIND_HOURS', 24))
+    IDLE_CLOSE_HOURS = float(os.getenv('IDLE_CLOSE_HOURS', 0))
+    
+    # Bulk closing (/close-stale): tickets closed at the same time
+    BULK_CLOSE_CONCURRENCY = int(os.getenv('BULK_CLOSE_CONCURRENCY', 5))
+    
+    # Users one /add, /remove or Add User modal may change at once (one channel edit)
+    TICKET_MEMBERS_MAX = int(os.getenv('TICKET_MEMBERS_MAX', 25))
+    
+    # Startup reconciliation: history requests in flight while recovering unknown ticket channels
+    RECONCILE_CONCURRENCY = int(os.getenv('RECONCILE_CONCURRENCY', 5))
+    
+    # Staff routing: new tickets go to the least-loaded available support member
+    # instead of pinging the role (opt-in). Types earlier in ROUTING_PRIORITY are served first.
+    ROUTING_ENABLED = os.getenv('ROUTING_ENABLED', '0') == '1'
+    ROUTING_PRIORITY = [key.strip() for key in os.getenv('ROUTING_PRIORITY', 'report_players,pov,buy_skin,donation,general').split(',') if key.strip()]
+    ROUTING_MAX_LOAD = int(os.getenv('ROUTING_MAX_LOAD', 5))
+    ROUTING_ACTIVE_MINUTES = float(os.getenv('ROUTING_ACTIVE_MINUTES', 15))
+    # Track staff online status from gateway presences (privileged intent, enable it in the portal)
+    ROUTING_PRESENCES = os.getenv('ROUTING_PRESENCES', '0') == '1'
+    
+    # Throttling per action: "<per user> <per guild>" as count/seconds (0 disables a scope)
+    THROTTLE_RULES = {
+        'ticket_create': os.getenv('THROTTLE_TICKET_CREATE', '2/60 30/60'),
+        'transcript': os.getenv('THROTTLE_TRANSCRIPT', '2/120 10/60'),
+        'stats': os.getenv('THROTTLE_STATS', '3/30 20/30'),
+        'search': os.getenv('THROTTLE_SEARCH', '5/60 30/60'),
+    }
+    
+    # Presence rotation: base tick, idle back-off ceiling and gateway budget
+    PRESENCE_INTERVAL = float(os.getenv('PRESENCE_INTERVAL', 10))
+    PRESENCE_MAX_INTERVAL = float(os.getenv('PRESENCE_MAX_INTERVAL', 300))
+    PRESENCE_BUDGET = int(os.getenv('PRESENCE_BUDGET', 5))
+    PRESENCE_BUDGET_WINDOW = float(os.getenv('PRESENCE_BUDGET_WINDOW', 60))
+    
+    # Lean cache: no member intent/chunking, members are fetched on demand into a small LRU
+    LEAN_CACHE = os.getenv('LEAN_CACHE', '0') == '1'
+    MEMBER_CACHE_SIZE = int(os.getenv('MEMBER_CACHE_SIZE', 2000))
+    MEMBER_CACHE_TTL = float(os.getenv('MEMBER_CACHE_TTL', 900))
+    
+    # Local state (ticket database, live transcript logs, ...)
+    DATA_DIR = os.getenv('DATA_DIR', 'data')
+    DATABASE_PATH = os.getenv('DATABASE_PATH', os.path.join(DATA_DIR, 'tickets.db'))
+    STORE_FLUSH_SECONDS = float(os.getenv('STORE_FLUSH_SECONDS', 1))
+    TRANSCRIPT_LOG_DIR = os.path.join(DATA_DIR, 'transcripts')
+    TRANSCRIPT_FLUSH_SECONDS = float(os.getenv('TRANSCRIPT_FLUSH_SECONDS', 2))
+    ARCHIVE_DIR = os.path.join(DATA_DIR, 'archive')
+    
+    # Attachment archival: '' (off), 'close' (when the transcript is made) or 'capture'
+    # (as messages arrive, before Discord's signed CDN links expire). Any other
+    # non-empty value behaves like 'close'.
+    ATTACHMENT_ARCHIVE = os.getenv('ATTACHMENT_ARCHIVE', '')
+    ATTACHMENT_TYPES = [key.strip() for key in os.getenv('ATTACHMENT_TYPES', 'pov,report_players').split(',') if key.strip()]
+    ATTACHMENT_DIR = os.getenv('ATTACHMENT_DIR', os.path.join(DATA_DIR, 'attachments'))
+    ATTACHMENT_CONCURRENCY = int(os.getenv('ATTACHMENT_CONCURRENCY', 4))
+    ATTACHMENT_MAX_BYTES = int(os.getenv('ATTACHMENT_MAX_BYTES', 25 * 1024 * 1024))
+    ATTACHMENT_TICKET_MAX_BYTES = int(os.getenv('ATTACHMENT_TICKET_MAX_BYTES', 250 * 1024 * 1024))
+    ATTACHMENT_BASE_URL = os.getenv('ATTACHMENT_BASE_URL')  # Where ATTACHMENT_DIR is served, for transcript links
+    
+    # Multi-guild deployment: commands are registered globally and each guild is
+    # configured with /ticket-config (GUILD_ID and the IDs above become that
+    # guild's defaults). SHARDED runs an AutoShardedBot for large guild counts.
+    MULTI_GUILD = os.getenv('MULTI_GUILD', '0') == '1'
+    SHARDED = os.getenv('SHARDED', '0') == '1'
+    
+    # HTTP interactions endpoint (interactions.py / worker.py)
+    PUBLIC_KEY = os.getenv('DISCORD_PUBLIC_KEY')
+    APPLICATION_ID = os.getenv('APPLICATION_ID')
+    
+    # Prometheus metrics endpoint (0 disables it)
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+    
+    # Tracing (fraction of ticket operations recorded, 0 disables) and profiling output
+    TRACE_SAMPLE_RATE = float(os.getenv('TRACE_SAMPLE_RATE', 0))
+    TRACE_FORMAT = os.getenv('TRACE_FORMAT', 'jsonl')  # jsonl or chrome
+    TRACE_PATH = os.getenv('TRACE_PATH', os.path.join(DATA_DIR, f"traces.{'json' if TRACE_FORMAT == 'chrome' else 'jsonl'}"))
+    PROFILE_DIR = os.path.join(DATA_DIR, 'profiles')
+    PROFILE_INTERVAL = float(os.getenv('PROFILE_INTERVAL', 0.005))
+    
+    # Full-text transcript search
+    SEARCH_MAX_BYTES = int(os.getenv('SEARCH_MAX_BYTES', 2 * 1024 * 1024))
+    SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', 10))
+    
     # Your 5 Custom Ticket Categories
     TICKET_TYPES = {
         "buy_skin": {
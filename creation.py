@@ -0,0 +1,117 @@
+import asyncio
+import time
+from collections import deque
+
+
+class CreationQueue:
+    """Bounded per-guild queues of ticket creations drained by a small worker pool
+
+    Interactions are deferred and enqueued immediately, so the 3-second
+    deadline never depends on Discord's REST latency. Each guild has its own
+    subqueue and at most `per_guild` creations running, so workers don't all
+    stack up behind the same guild channel-create rate-limit bucket. Workers
+    take guilds round-robin from a ready list that only holds guilds with
+    work and a free slot, so a burst in one guild never blocks the others.
+    """
+
+    def __init__(self, maxsize: int, workers: int, per_guild: int):
+        self._maxsize = maxsize
+        self._workers = workers
+        self._per_guild = per_guild
+        self._pending = {}      # guild_id -> deque of (job, enqueued at)
+        self._active = {}       # guild_id -> creations running
+        self._ready = deque()   # guilds with pending work and a free slot, each listed once
+        self._listed = set()
+        self._available = asyncio.Event()
+        self._depth = 0
+        self._tasks = []
+
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.wait_times = deque(maxlen=500)     # seconds spent queued
+        self.channel_times = deque(maxlen=500)  # seconds from enqueue to finished ticket
+
+    def start(self):
+        for _ in range(self._workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    def submit(self, guild_id: int, job) -> bool:
+        """Queue a zero-argument coroutine function, False if the queue is full"""
+        if self._depth >= self._maxsize:
+            self.rejected += 1
+            return False
+
+        self._pending.setdefault(guild_id, deque()).append((job, time.perf_counter()))
+        self._depth += 1
+        self.max_depth = max(self.max_depth, self._depth)
+        self._list(guild_id)
+        return True
+
+    def _list(self, guild_id: int):
+        """Put a guild on the ready list if it has work and a free slot"""
+        if guild_id in self._listed or not self._pending.get(guild_id):
+            return
+        if self._active.get(guild_id, 0) >= self._per_guild:
+            return
+        self._ready.append(guild_id)
+        self._listed.add(guild_id)
+        self._available.set()
+
+    async def _worker(self):
+        while True:
+            while not self._ready:
+                self._available.clear()
+                await self._available.wait()
+
+            guild_id = self._ready.popleft()
+            self._listed.discard(guild_id)
+            jobs = self._pending[guild_id]
+            job, enqueued = jobs.popleft()
+            if not jobs:
+                del self._pending[guild_id]
+            self._depth -= 1
+            self._active[guild_id] = self._active.get(guild_id, 0) + 1
+            self._list(guild_id)  # Back of the line if it still has work and slots
+
+            try:
+                self.wait_times.append(time.perf_counter() - enqueued)
+                await job()
+                self.processed += 1
+                self.channel_times.append(time.perf_counter() - enqueued)
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ Ticket creation failed: {e}")
+            finally:
+                self._active[guild_id] -= 1
+                if not self._active[guild_id]:
+                    del self._active[guild_id]
+                self._list(guild_id)
+
+    def snapshot(self) -> dict:
+        def percentile(samples, q):
+            if not samples:
+                return 0.0
+            ordered = sorted(samples)
+            return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+        return {
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'processed': self.processed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'wait_p50': percentile(self.wait_times, 0.5),
+            'channel_p50': percentile(self.channel_times, 0.5),
+            'channel_p95': percentile(self.channel_times, 0.95)
+        }
@@ -0,0 +1,74 @@
+class GuildSettings:
+    """Ticket configuration of one guild: categories, staff role, log channel and enabled types"""
+
+    def __init__(self, guild_id: int, categories: dict = None, support_role_id: int = 0,
+                 log_channel_id: int = 0, ticket_types: list = None):
+        self.guild_id = guild_id
+        self.categories = {key: int(value) for key, value in (categories or {}).items()}
+        self.support_role_id = int(support_role_id or 0)
+        self.log_channel_id = int(log_channel_id or 0)
+        self.ticket_types = list(ticket_types) if ticket_types else None  # None = every type
+
+    def category_id(self, ticket_type: str) -> int:
+        return self.categories.get(ticket_type, 0)
+
+    def enabled_types(self, all_types) -> list:
+        return [key for key in all_types if self.ticket_types is None or key in self.ticket_types]
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.categories)
+
+    def to_dict(self) -> dict:
+        return {
+            'categories': self.categories,
+            'support_role_id': self.support_role_id,
+            'log_channel_id': self.log_channel_id,
+            'ticket_types': self.ticket_types
+        }
+
+    @classmethod
+    def from_dict(cls, guild_id: int, data: dict):
+        return cls(guild_id, **data)
+
+
+class GuildSettingsStore:
+    """Per-guild settings, loaded lazily from the ticket database and cached
+
+    Guilds with no stored settings fall back to `defaults` (the single-guild
+    values from Config) or to an empty configuration, so a newly added guild
+    works as soon as an admin runs /ticket-config, without a restart.
+    """
+
+    def __init__(self, store, defaults: dict = None, on_load=None):
+        self.store = store
+        self.defaults = defaults or {}   # guild_id -> GuildSettings
+        self.on_load = on_load           # called with settings the first time a guild is loaded
+        self._cache = {}
+
+    def cached(self, guild_id: int):
+        return self._cache.get(guild_id)
+
+    async def get(self, guild_id: int) -> GuildSettings:
+        settings = self._cache.get(guild_id)
+        if settings is not None:
+            return settings
+
+        data = await self.store.load_guild_settings(guild_id)
+        if data is not None:
+            settings = GuildSettings.from_dict(guild_id, data)
+        elif guild_id in self.defaults:
+            settings = self.defaults[guild_id]
+        else:
+            settings = GuildSettings(guild_id)
+
+        # Another caller may have loaded it while we were waiting on the store
+        if guild_id not in self._cache:
+            self._cache[guild_id] = settings
+            if self.on_load:
+                self.on_load(settings)
+        return self._cache[guild_id]
+
+    def save(self, settings: GuildSettings):
+        self._cache[settings.guild_id] = settings
+        self.store.save_guild_settings(settings.guild_id, settings.to_dict())
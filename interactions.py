@@ -0,0 +1,790 @@
+"""Discord HTTP interactions endpoint (no gateway connection)
+
+Discord POSTs every interaction to a webhook URL instead of sending it over
+the gateway. Each request is verified with the application's Ed25519 public
+key, answered within Discord's 3 second deadline, and any slow work (creating
+the channel, building a transcript) runs afterwards as a background job that
+follows up through the interaction webhook.
+
+Nothing is kept between requests except what the pluggable store holds, so
+the same handler runs in a long-lived process (`python interactions.py serve`)
+or in a Cloudflare Worker (see worker.py). Only the standard library and this
+repo's light modules are imported up front, to keep cold starts short.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+import time
+import uuid
+
+from config import Config
+from guild_settings import GuildSettings
+from mentions import parse_user_ids
+
+API_BASE = "https://discord.com/api/v10"
+
+# Interaction and response types
+PING = 1
+APPLICATION_COMMAND = 2
+MESSAGE_COMPONENT = 3
+PONG = 1
+CHANNEL_MESSAGE = 4
+DEFERRED_CHANNEL_MESSAGE = 5
+UPDATE_MESSAGE = 7
+EPHEMERAL = 1 << 6
+
+# Permission bits used in channel overwrites and admin checks
+ADMINISTRATOR = 1 << 3
+VIEW_CHANNEL = 1 << 10
+SEND_MESSAGES = 1 << 11
+
+# Rejects replayed requests whose signed timestamp is older than this (seconds)
+MAX_CLOCK_SKEW = 300
+
+
+# ==================== SIGNATURES ====================
+
+def _load_verifier(public_key: str):
+    """Ed25519 verify(signature, message) from PyNaCl, or cryptography as a fallback"""
+    key = bytes.fromhex(public_key)
+    try:
+        from nacl.signing import VerifyKey
+        from nacl.exceptions import BadSignatureError
+    except ImportError:
+        pass
+    else:
+        verify_key = VerifyKey(key)
+
+        def verify(signature: bytes, message: bytes) -> bool:
+            try:
+                verify_key.verify(message, signature)
+                return True
+            except BadSignatureError:
+                return False
+        return verify
+
+    try:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+    except ImportError:
+        raise RuntimeError("Signature verification needs PyNaCl or cryptography (pip install ticket-godbattle[interactions])")
+
+    verify_key = Ed25519PublicKey.from_public_bytes(key)
+
+    def verify(signature: bytes, message: bytes) -> bool:
+        try:
+            verify_key.verify(signature, message)
+            return True
+        except InvalidSignature:
+            return False
+    return verify
+
+
+class SignatureVerifier:
+    """Checks X-Signature-Ed25519 over X-Signature-Timestamp + body"""
+
+    def __init__(self, public_key: str):
+        self._verify = _load_verifier(public_key)
+
+    def __call__(self, signature: str, timestamp: str, body: bytes) -> bool:
+        if not signature or not timestamp:
+            return False
+        try:
+            signature = bytes.fromhex(signature)
+            if abs(time.time() - int(timestamp)) > MAX_CLOCK_SKEW:
+                return False
+        except ValueError:
+            return False
+        return self._verify(signature, timestamp.encode() + body)
+
+
+# ==================== REST ====================
+
+def encode_multipart(payload: dict, files: dict) -> tuple:
+    """multipart/form-data body with payload_json plus files (name -> bytes)"""
+    boundary = uuid.uuid4().hex
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="payload_json"\r\n'
+        f'Content-Type: application/json\r\n\r\n'.encode() + json.dumps(payload).encode() + b"\r\n"
+    ]
+    for index, (filename, data) in enumerate(files.items()):
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="files[{index}]"; filename="{filename}"\r\n'
+            f'Content-Type: application/octet-stream\r\n\r\n'.encode() + data + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return f"multipart/form-data; boundary={boundary}", b"".join(parts)
+
+
+class DiscordError(Exception):
+    def __init__(self, status: int, body):
+        super().__init__(f"Discord API returned {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+async def aiohttp_transport(method: str, url: str, headers: dict, body: bytes):
+    """Default transport: (status, parsed JSON or None) using aiohttp"""
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        async with session.request(method, url, headers=headers, data=body) as response:
+            text = await response.text()
+            return response.status, json.loads(text) if text else None
+
+
+class DiscordREST:
+    """Just enough of the Discord REST API for the interaction handlers
+
+    `transport` is an async (method, url, headers, body) -> (status, data)
+    callable, so the Worker can route requests through its own fetch().
+    """
+
+    def __init__(self, token: str, application_id: str, transport=aiohttp_transport):
+        self.token = token
+        self.application_id = application_id
+        self.transport = transport
+
+    async def request(self, method: str, path: str, payload: dict = None, files: dict = None, reason: str = None):
+        headers = {'Authorization': f"Bot {self.token}"}
+        body = None
+        if files:
+            headers['Content-Type'], body = encode_multipart(payload or {}, files)
+        elif payload is not None:
+            headers['Content-Type'] = "application/json"
+            body = json.dumps(payload).encode()
+        if reason:
+            headers['X-Audit-Log-Reason'] = reason
+
+        status, data = await self.transport(method, API_BASE + path, headers, body)
+        if status >= 400:
+            raise DiscordError(status, data)
+        return data
+
+    # ---------- interaction webhook ----------
+
+    async def edit_original(self, token: str, payload: dict):
+        return await self.request("PATCH", f"/webhooks/{self.application_id}/{token}/messages/@original", payload)
+
+    async def followup(self, token: str, payload: dict, files: dict = None):
+        return await self.request("POST", f"/webhooks/{self.application_id}/{token}", payload, files)
+
+    # ---------- channels ----------
+
+    async def create_channel(self, guild_id: int, payload: dict):
+        return await self.request("POST", f"/guilds/{guild_id}/channels", payload)
+
+    async def delete_channel(self, channel_id: int, reason: str = None):
+        return await self.request("DELETE", f"/channels/{channel_id}", reason=reason)
+
+    async def send_message(self, channel_id: int, payload: dict, files: dict = None):
+        return await self.request("POST", f"/channels/{channel_id}/messages", payload, files)
+
+    async def set_member_access(self, channel_id: int, user_ids: list, allowed: bool) -> list:
+        """Grant or revoke several members' access with one channel edit, returning the ids changed"""
+        channel = await self.request("GET", f"/channels/{channel_id}")
+        overwrites = {overwrite['id']: overwrite for overwrite in channel.get('permission_overwrites', [])}
+        changed = []
+        for user_id in map(str, user_ids):
+            if allowed:
+                overwrites[user_id] = {'id': user_id, 'type': 1, 'allow': str(VIEW_CHANNEL | SEND_MESSAGES), 'deny': "0"}
+                changed.append(int(user_id))
+            elif overwrites.get(user_id, {}).get('type') == 1 and user_id != str(self.application_id):
+                del overwrites[user_id]
+                changed.append(int(user_id))
+        if changed:
+            await self.request("PATCH", f"/channels/{channel_id}", {'permission_overwrites': list(overwrites.values())})
+        return changed
+
+    async def history(self, channel_id: int, page_size: int = 100):
+        """Every message of a channel, oldest first"""
+        messages, before = [], None
+        while True:
+            query = f"?limit={page_size}" + (f"&before={before}" if before else "")
+            page = await self.request("GET", f"/channels/{channel_id}/messages{query}")
+            messages.extend(page)
+            if len(page) < page_size:
+                break
+            before = page[-1]['id']
+        messages.reverse()
+        return messages
+
+
+# ==================== STORES ====================
+
+class MemoryStore:
+    """In-process ticket state for local runs; see TicketStoreAdapter and worker.KVStore
+
+    Every store offers the same async methods, which is all the handlers use.
+    """
+
+    def __init__(self):
+        self.tickets = {}     # channel_id -> ticket
+        self.sequences = {}   # name -> last number
+        self.settings = {}    # guild_id -> settings dict
+
+    async def load_guild_settings(self, guild_id: int):
+        return self.settings.get(guild_id)
+
+    async def get_ticket(self, channel_id: int):
+        return self.tickets.get(channel_id)
+
+    async def channel_for_user(self, guild_id: int, user_id: int):
+        for ticket in self.tickets.values():
+            if ticket['guild_id'] == guild_id and ticket['user_id'] == user_id:
+                return ticket['channel_id']
+        return None
+
+    async def next_number(self, name: str) -> int:
+        self.sequences[name] = self.sequences.get(name, 0) + 1
+        return self.sequences[name]
+
+    async def add_ticket(self, ticket: dict):
+        self.tickets[ticket['channel_id']] = ticket
+
+    async def close_ticket(self, channel_id: int, closed_at: str, closed_by: int = None):
+        return self.tickets.pop(channel_id, None)
+
+    async def open_counts(self, guild_id: int) -> dict:
+        counts = {}
+        for ticket in self.tickets.values():
+            if ticket['guild_id'] == guild_id:
+                counts[ticket['type']] = counts.get(ticket['type'], 0) + 1
+        return counts
+
+
+class TicketStoreAdapter:
+    """Serves the handlers from the gateway bot's SQLite ticket store
+
+    Use it only when the gateway bot is not running against the same
+    database, since each process mirrors open tickets in its own memory.
+    """
+
+    def __init__(self, store):
+        self.store = store   # storage.TicketStore, already loaded
+
+    async def load_guild_settings(self, guild_id: int):
+        return await self.store.load_guild_settings(guild_id)
+
+    async def get_ticket(self, channel_id: int):
+        return self.store.get(channel_id)
+
+    async def channel_for_user(self, guild_id: int, user_id: int):
+        return self.store.channel_for_user(guild_id, user_id)
+
+    async def next_number(self, name: str) -> int:
+        return await self.store.next_number(name)
+
+    async def add_ticket(self, ticket: dict):
+        self.store.add(
+            ticket['channel_id'], ticket['guild_id'], ticket['user_id'], ticket['type'],
+            ticket['category'], ticket['created_at'], number=ticket['number']
+        )
+
+    async def close_ticket(self, channel_id: int, closed_at: str, closed_by: int = None):
+        return self.store.close(channel_id, closed_at, closed_by=closed_by)
+
+    async def open_counts(self, guild_id: int) -> dict:
+        counts = {}
+        for ticket in self.store.open_tickets():
+            if ticket['guild_id'] == guild_id:
+                counts[ticket['type']] = counts.get(ticket['type'], 0) + 1
+        return counts
+
+
+# ==================== HANDLERS ====================
+
+def message(content: str = None, embeds: list = None, components: list = None, ephemeral: bool = True) -> dict:
+    data = {'flags': EPHEMERAL if ephemeral else 0}
+    if content is not None:
+        data['content'] = content
+    if embeds:
+        data['embeds'] = embeds
+    if components is not None:
+        data['components'] = components
+    return data
+
+
+def ticket_buttons() -> list:
+    """Same custom ids as bot.BeautifulTicketView, so either mode can handle the clicks"""
+    return [{
+        'type': 1,
+        'components': [
+            {'type': 2, 'style': 4, 'label': "🔒 Close Ticket", 'custom_id': "close_ticket"},
+            {'type': 2, 'style': 2, 'label': "📄 Transcript", 'custom_id': "transcript"}
+        ]
+    }]
+
+
+def utcnow() -> str:
+    return datetime.datetime.utcnow().isoformat()
+
+
+class InteractionApp:
+    """Verifies and answers interaction webhooks
+
+    handle() returns (status, response body, background job). The host must
+    send the response first and then run the job (a coroutine or None); the
+    job finishes the work through the interaction's followup webhook.
+    """
+
+    def __init__(self, public_key: str, rest: DiscordREST, store, defaults: dict = None):
+        self.verify = SignatureVerifier(public_key)
+        self.rest = rest
+        self.store = store
+        self.defaults = defaults or {}   # guild_id -> GuildSettings used until /ticket-config saves some
+
+        self.components = {
+            "ticket_select": self.on_ticket_select,
+            "close_ticket": self.on_close_button,
+            "confirm_close": self.on_confirm_close,
+            "cancel_close": self.on_cancel_close,
+            "transcript": self.on_transcript_button
+        }
+        self.commands = {
+            "close": self.on_close_button,
+            "add": self.on_add_command,
+            "remove": self.on_remove_command,
+            "stats": self.on_stats_command
+        }
+
+    async def handle(self, headers: dict, body: bytes):
+        headers = {key.lower(): value for key, value in headers.items()}
+        if not self.verify(headers.get('x-signature-ed25519'), headers.get('x-signature-timestamp'), body):
+            return 401, {'error': "invalid request signature"}, None
+
+        interaction = json.loads(body)
+        if interaction['type'] == PING:
+            return 200, {'type': PONG}, None
+
+        if interaction['type'] == MESSAGE_COMPONENT:
+            handler = self.components.get(interaction['data']['custom_id'])
+        elif interaction['type'] == APPLICATION_COMMAND:
+            handler = self.commands.get(interaction['data']['name'])
+        else:
+            handler = None
+
+        if handler is None:
+            return 200, self.reply("❌ This action is only available while the gateway bot is running."), None
+
+        try:
+            response, job = await handler(interaction)
+        except Exception as e:
+            print(f"❌ Interaction {interaction.get('id')} failed: {e}")
+            return 200, self.reply("❌ Something went wrong, please try again."), None
+        return 200, response, job
+
+    @staticmethod
+    def reply(content: str, response_type: int = CHANNEL_MESSAGE, **kwargs) -> dict:
+        return {'type': response_type, 'data': message(content, **kwargs)}
+
+    # ---------- helpers ----------
+
+    async def settings_for(self, guild_id: int) -> GuildSettings:
+        # Re-read on every request: the store may be shared with other isolates
+        data = await self.store.load_guild_settings(guild_id)
+        if data is not None:
+            return GuildSettings.from_dict(guild_id, data)
+        return self.defaults.get(guild_id) or GuildSettings(guild_id)
+
+    def is_authorized(self, interaction: dict, settings: GuildSettings, ticket: dict = None) -> bool:
+        """authz.is_authorized() from the roles and permissions sent with the interaction"""
+        member = interaction.get('member') or {}
+        user_id = int(member.get('user', {}).get('id', 0))
+        if settings.support_role_id and str(settings.support_role_id) in member.get('roles', []):
+            return True
+        if ticket is not None and ticket['user_id'] == user_id:
+            return True
+        return bool(int(member.get('permissions', 0)) & ADMINISTRATOR)
+
+    async def followup_error(self, interaction: dict, content: str):
+        try:
+            await self.rest.edit_original(interaction['token'], {'content': content})
+        except DiscordError as e:
+            print(f"❌ Could not report an error to {interaction['id']}: {e}")
+
+    # ---------- ticket panel ----------
+
+    async def on_ticket_select(self, interaction: dict):
+        guild_id = int(interaction['guild_id'])
+        user = interaction['member']['user']
+        ticket_type = interaction['data']['values'][0]
+        settings = await self.settings_for(guild_id)
+
+        if ticket_type not in settings.enabled_types(Config.TICKET_TYPES):
+            return self.reply("❌ This ticket type is disabled here."), None
+        if not settings.category_id(ticket_type):
+            return self.reply("❌ Category not found! Contact admin."), None
+
+        existing = await self.store.channel_for_user(guild_id, int(user['id']))
+        if existing is not None:
+            return self.reply(f"❌ You already have a ticket! <#{existing}>"), None
+
+        return (
+            {'type': DEFERRED_CHANNEL_MESSAGE, 'data': {'flags': EPHEMERAL}},
+            self.create_ticket(interaction, guild_id, user, ticket_type, settings)
+        )
+
+    async def create_ticket(self, interaction: dict, guild_id: int, user: dict, ticket_type: str,
+                            settings: GuildSettings):
+        try:
+            ticket_info = Config.TICKET_TYPES[ticket_type]
+            number = await self.store.next_number(f"{guild_id}:{ticket_type}")
+            allow = str(VIEW_CHANNEL | SEND_MESSAGES)
+
+            overwrites = [
+                {'id': str(guild_id), 'type': 0, 'allow': "0", 'deny': str(VIEW_CHANNEL)},
+                {'id': str(self.rest.application_id), 'type': 1, 'allow': allow, 'deny': "0"},
+                {'id': user['id'], 'type': 1, 'allow': allow, 'deny': "0"}
+            ]
+            if settings.support_role_id:
+                overwrites.append({'id': str(settings.support_role_id), 'type': 0, 'allow': allow, 'deny': "0"})
+
+            channel = await self.rest.create_channel(guild_id, {
+                'name': f"ticket-{number:04d}-{user['username'].lower()}",
+                'type': 0,
+                'parent_id': str(settings.category_id(ticket_type)),
+                'permission_overwrites': overwrites
+            })
+
+            await self.rest.send_message(channel['id'], {
+                'content': f"<@&{settings.support_role_id}>" if settings.support_role_id else "",
+                'embeds': [{
+                    'title': f"{ticket_info['emoji']} **{ticket_info['name']} TICKET**",
+                    'description': f"✨ **Welcome <@{user['id']}>!**\n\n{ticket_info['description']}",
+                    'color': ticket_info['color'],
+                    'fields': [{'name': "🆔 **TICKET ID**", 'value': f"#{number:04d}", 'inline': True}],
+                    'timestamp': utcnow()
+                }],
+                'components': ticket_buttons()
+            })
+
+            await self.store.add_ticket({
+                'channel_id': int(channel['id']),
+                'guild_id': guild_id,
+                'user_id': int(user['id']),
+                'type': ticket_type,
+                'category': ticket_info['name'],
+                'created_at': utcnow(),
+                'number': number
+            })
+            await self.rest.edit_original(interaction['token'], {'content': f"✅ Ticket created! <#{channel['id']}>"})
+        except Exception as e:
+            print(f"❌ HTTP ticket creation failed: {e}")
+            await self.followup_error(interaction, "❌ Could not create your ticket, please try again.")
+
+    # ---------- closing ----------
+
+    async def on_close_button(self, interaction: dict):
+        channel_id = int(interaction['channel_id'])
+        ticket = await self.store.get_ticket(channel_id)
+        if ticket is None:
+            return self.reply("❌ Ticket channel only!"), None
+
+        settings = await self.settings_for(int(interaction['guild_id']))
+        if not self.is_authorized(interaction, settings, ticket):
+            return self.reply("❌ You don't have permission to close this ticket!"), None
+
+        return self.reply(
+            "⚠️ **Are you sure you want to close this ticket?**",
+            components=[{
+                'type': 1,
+                'components': [
+                    {'type': 2, 'style': 4, 'label': "✅ Yes, Close", 'custom_id': "confirm_close"},
+                    {'type': 2, 'style': 2, 'label': "❌ Cancel", 'custom_id': "cancel_close"}
+                ]
+            }]
+        ), None
+
+    async def on_cancel_close(self, interaction: dict):
+        return self.reply("✅ Closure cancelled.", UPDATE_MESSAGE, components=[]), None
+
+    async def on_confirm_close(self, interaction: dict):
+        channel_id = int(interaction['channel_id'])
+        ticket = await self.store.get_ticket(channel_id)
+        settings = await self.settings_for(int(interaction['guild_id']))
+        if ticket is None or not self.is_authorized(interaction, settings, ticket):
+            return self.reply("❌ This ticket can't be closed.", UPDATE_MESSAGE, components=[]), None
+
+        return (
+            self.reply("📝 Generating transcript and closing ticket...", UPDATE_MESSAGE, components=[]),
+            self.close_ticket(interaction, ticket, settings)
+        )
+
+    async def close_ticket(self, interaction: dict, ticket: dict, settings: GuildSettings):
+        channel_id = ticket['channel_id']
+        closed_by = interaction['member']['user']
+        try:
+            name, transcript = await self.render_transcript(channel_id, ticket)
+            if settings.log_channel_id:
+                ticket_info = Config.TICKET_TYPES.get(ticket['type'], {"emoji": "🎫", "name": "UNKNOWN"})
+                await self.rest.send_message(settings.log_channel_id, {
+                    'embeds': [{
+                        'title': "🔒 Ticket Closed",
+                        'color': 0xe74c3c,
+                        'fields': [
+                            {'name': "Created By", 'value': f"<@{ticket['user_id']}>", 'inline': True},
+                            {'name': "Ticket Type", 'value': f"{ticket_info['emoji']} {ticket_info['name']}", 'inline': True},
+                            {'name': "Closed By", 'value': f"<@{closed_by['id']}>", 'inline': True}
+                        ],
+                        'timestamp': utcnow()
+                    }]
+                }, files={name: transcript})
+
+            await self.store.close_ticket(channel_id, utcnow(), closed_by=int(closed_by['id']))
+            await self.rest.delete_channel(channel_id, reason=f"Closed by {closed_by['username']}")
+        except Exception as e:
+            print(f"❌ HTTP close of {channel_id} failed: {e}")
+            await self.followup_error(interaction, "❌ Could not close the ticket, please try again.")
+
+    # ---------- transcripts ----------
+
+    async def render_transcript(self, channel_id: int, ticket: dict = None):
+        """(filename, bytes) of a plain transcript built from channel history"""
+        lines = [
+            "=" * 60,
+            "GODBATTLE TICKET TRANSCRIPT",
+            f"Channel: {channel_id}",
+            f"Generated: {datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')}",
+            "=" * 60,
+            ""
+        ]
+        if ticket:
+            lines += [
+                f"Ticket Type: {ticket['category']}",
+                f"Created By: {ticket['user_id']}",
+                f"Created At: {ticket['created_at']}",
+                ""
+            ]
+
+        for entry in await self.rest.history(channel_id):
+            content = entry['content']
+            if entry.get('attachments'):
+                content += f" [Attachments: {', '.join(a['filename'] for a in entry['attachments'])}]"
+            timestamp = entry['timestamp'][:19].replace('T', ' ')
+            author = entry['author']
+            lines.append(f"[{timestamp}] {author['username']}#{author.get('discriminator', '0')}: {content}")
+
+        lines += ["", "=" * 60, "END OF TRANSCRIPT", "=" * 60, ""]
+        filename = f"transcript-{channel_id}-{datetime.datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.txt"
+        return filename, "\n".join(lines).encode("utf-8")
+
+    async def on_transcript_button(self, interaction: dict):
+        return (
+            {'type': DEFERRED_CHANNEL_MESSAGE, 'data': {'flags': EPHEMERAL}},
+            self.send_transcript(interaction)
+        )
+
+    async def send_transcript(self, interaction: dict):
+        channel_id = int(interaction['channel_id'])
+        try:
+            name, transcript = await self.render_transcript(channel_id, await self.store.get_ticket(channel_id))
+            await self.rest.edit_original(interaction['token'], {
+                'embeds': [{'title': "📄 Ticket Transcript", 'description': f"Channel: <#{channel_id}>", 'color': 0x3498db}]
+            })
+            await self.rest.followup(interaction['token'], {'flags': EPHEMERAL}, files={name: transcript})
+        except Exception as e:
+            print(f"❌ HTTP transcript of {channel_id} failed: {e}")
+            await self.followup_error(interaction, "❌ Could not build the transcript.")
+
+    # ---------- commands ----------
+
+    async def on_member_command(self, interaction: dict, allowed: bool):
+        channel_id = int(interaction['channel_id'])
+        if await self.store.get_ticket(channel_id) is None:
+            return self.reply("❌ Ticket channel only!"), None
+        # Staff and admins only, as with the gateway /add and /remove
+        if not self.is_authorized(interaction, await self.settings_for(int(interaction['guild_id']))):
+            return self.reply("❌ No permission!"), None
+
+        options = {option['name']: option['value'] for option in interaction['data'].get('options', [])}
+        user_ids = parse_user_ids(options.get('users'))[:Config.TICKET_MEMBERS_MAX]
+        if not user_ids:
+            return self.reply("❌ No user IDs or mentions found!"), None
+        return (
+            {'type': DEFERRED_CHANNEL_MESSAGE, 'data': {'flags': EPHEMERAL}},
+            self.update_members(interaction, channel_id, user_ids, allowed)
+        )
+
+    async def update_members(self, interaction: dict, channel_id: int, user_ids: list, allowed: bool):
+        try:
+            changed = await self.rest.set_member_access(channel_id, user_ids, allowed)
+            lines = []
+            if changed:
+                verb = "Added" if allowed else "Removed"
+                lines.append(f"✅ {verb} {', '.join(f'<@{user_id}>' for user_id in changed)} {'to' if allowed else 'from'} the ticket!")
+            missing = [user_id for user_id in user_ids if user_id not in changed]
+            if missing:
+                lines.append(f"⚠️ {', '.join(f'<@{user_id}>' for user_id in missing)} not in this ticket")
+            await self.rest.edit_original(interaction['token'], {'content': "\n".join(lines)})
+        except Exception as e:
+            print(f"❌ HTTP member update of {channel_id} failed: {e}")
+            await self.followup_error(interaction, "❌ Could not update the ticket members, please try again.")
+
+    async def on_add_command(self, interaction: dict):
+        return await self.on_member_command(interaction, allowed=True)
+
+    async def on_remove_command(self, interaction: dict):
+        return await self.on_member_command(interaction, allowed=False)
+
+    async def on_stats_command(self, interaction: dict):
+        counts = await self.store.open_counts(int(interaction['guild_id']))
+        lines = [
+            f"• {Config.TICKET_TYPES[key]['name']}: **{count}** tickets"
+            for key, count in counts.items() if count and key in Config.TICKET_TYPES
+        ]
+        return {'type': CHANNEL_MESSAGE, 'data': message(embeds=[{
+            'title': "📊 **Ticket Statistics**",
+            'color': 0x3498db,
+            'fields': [
+                {'name': "📌 Total Active Tickets", 'value': f"```{sum(counts.values())}```", 'inline': False},
+                {'name': "📋 By Category", 'value': "\n".join(lines) or "No active tickets", 'inline': False}
+            ]
+        }])}, None
+
+
+def config_defaults() -> dict:
+    """Settings for GUILD_ID from the .env values, like bot.guild_settings"""
+    return {
+        Config.GUILD_ID: GuildSettings(
+            Config.GUILD_ID,
+            categories={key: Config.get_category_id(key) for key in Config.TICKET_TYPES},
+            support_role_id=Config.SUPPORT_ROLE_ID,
+            log_channel_id=Config.LOG_CHANNEL_ID
+        )
+    }
+
+
+# ==================== LOCAL SERVER & CLIENT ====================
+
+async def serve(app: InteractionApp, host: str, port: int):
+    """Run the endpoint with aiohttp (point Discord or `send` at http://host:port/interactions)"""
+    from aiohttp import web
+
+    jobs = set()
+
+    async def interactions(request):
+        status, payload, job = await app.handle(dict(request.headers), await request.read())
+        if job is not None:
+            task = asyncio.create_task(job)
+            jobs.add(task)
+            task.add_done_callback(jobs.discard)
+        return web.json_response(payload, status=status)
+
+    server = web.Application()
+    server.router.add_post("/interactions", interactions)
+    runner = web.AppRunner(server)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    print(f"🌐 Interactions endpoint listening on http://{host}:{port}/interactions")
+    await asyncio.Event().wait()
+
+
+def sign(private_key: str, body: bytes, timestamp: str = None) -> dict:
+    """Headers Discord would send with `body`, signed with a local test key (PyNaCl)"""
+    from nacl.signing import SigningKey
+    timestamp = timestamp or str(int(time.time()))
+    signature = SigningKey(bytes.fromhex(private_key)).sign(timestamp.encode() + body).signature
+    return {
+        'Content-Type': "application/json",
+        'X-Signature-Ed25519': signature.hex(),
+        'X-Signature-Timestamp': timestamp
+    }
+
+
+async def send(url: str, private_key: str, payload: dict):
+    """Stand-in for Discord: POST a signed interaction and return (status, response)"""
+    import aiohttp
+    body = json.dumps(payload).encode()
+    async with aiohttp.ClientSession() as session:
+        async with session.post(url, data=body, headers=sign(private_key, body)) as response:
+            return response.status, await response.json(content_type=None)
+
+
+def sample_interaction(kind: str, guild_id: int, channel_id: int, user_id: int, value: str = None) -> dict:
+    """Minimal interaction payloads for local testing"""
+    interaction = {
+        'id': str(int(time.time() * 1000)),
+        'application_id': os.getenv('APPLICATION_ID', "0"),
+        'token': "local-test-token",
+        'guild_id': str(guild_id),
+        'channel_id': str(channel_id),
+        'member': {'user': {'id': str(user_id), 'username': "tester"}, 'roles': [], 'permissions': "0"}
+    }
+    if kind == "ping":
+        return {'id': interaction['id'], 'type': PING}
+    if kind in ("ticket_select", "close_ticket", "confirm_close", "transcript"):
+        interaction.update(type=MESSAGE_COMPONENT, data={'custom_id': kind, 'component_type': 2})
+        if kind == "ticket_select":
+            interaction['data'].update(component_type=3, values=[value or "general"])
+        return interaction
+    interaction.update(type=APPLICATION_COMMAND, data={'name': kind, 'options': []})
+    if value:
+        interaction['data']['options'].append({'name': "users", 'type': 3, 'value': value})
+    return interaction
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Discord HTTP interactions endpoint")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the endpoint locally")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8080)
+    serve_parser.add_argument("--database", help="use this SQLite ticket database instead of in-memory state")
+
+    commands.add_parser("keygen", help="print a local Ed25519 key pair for testing")
+
+    send_parser = commands.add_parser("send", help="post a signed sample interaction")
+    send_parser.add_argument("kind", help="ping, ticket_select, close_ticket, confirm_close, transcript, stats, add, remove")
+    send_parser.add_argument("--url", default="http://127.0.0.1:8080/interactions")
+    send_parser.add_argument("--key", default=os.getenv('INTERACTIONS_TEST_KEY'), help="private key from keygen")
+    send_parser.add_argument("--guild", type=int, default=Config.GUILD_ID)
+    send_parser.add_argument("--channel", type=int, default=0)
+    send_parser.add_argument("--user", type=int, default=0)
+    send_parser.add_argument("--value", help="ticket type for ticket_select, user ids or mentions for add/remove")
+
+    args = parser.parse_args()
+
+    if args.command == "keygen":
+        from nacl.signing import SigningKey
+        key = SigningKey.generate()
+        print(f"DISCORD_PUBLIC_KEY={key.verify_key.encode().hex()}")
+        print(f"INTERACTIONS_TEST_KEY={key.encode().hex()}")
+        return
+
+    if args.command == "send":
+        if not args.key:
+            sys.exit("❌ No private key (run keygen, then pass --key or set INTERACTIONS_TEST_KEY)")
+        payload = sample_interaction(args.kind, args.guild, args.channel, args.user, args.value)
+        status, response = asyncio.run(send(args.url, args.key, payload))
+        print(status, json.dumps(response, indent=2, ensure_ascii=False))
+        return
+
+    if not Config.PUBLIC_KEY:
+        sys.exit("❌ DISCORD_PUBLIC_KEY is not set!")
+
+    async def run():
+        if args.database:
+            from storage import TicketStore
+            ticket_store = TicketStore(args.database, default_guild_id=Config.GUILD_ID)
+            await ticket_store.load()
+            store = TicketStoreAdapter(ticket_store)
+
+            async def flush_forever():
+                while True:
+                    await asyncio.sleep(Config.STORE_FLUSH_SECONDS)
+                    await ticket_store.flush()
+            flusher = asyncio.create_task(flush_forever())
+        else:
+            store = MemoryStore()
+        rest = DiscordREST(Config.TOKEN, Config.APPLICATION_ID)
+        await serve(InteractionApp(Config.PUBLIC_KEY, rest, store, config_defaults()), args.host, args.port)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+import discord
+
+class MemberResolver:
+    """Bounded LRU of guild members resolved on demand
+
+    Used instead of the full member cache in lean mode: the bot only ever
+    needs a handful of members (ticket creators, staff, added users), so they
+    are fetched once over REST and kept for a while. Concurrent misses for
+    the same member share one fetch_member call.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._members = OrderedDict()   # (guild_id, user_id) -> (member, fetched_at)
+        self._inflight = {}             # (guild_id, user_id) -> Future
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def remember(self, member: discord.Member):
+        key = (member.guild.id, member.id)
+        self._members[key] = (member, time.monotonic())
+        self._members.move_to_end(key)
+        while len(self._members) > self.maxsize:
+            self._members.popitem(last=False)
+
+    def forget(self, guild_id: int, user_id: int):
+        self._members.pop((guild_id, user_id), None)
+
+    def get(self, guild: discord.Guild, user_id: int):
+        """Cached member or None, without any REST call"""
+        member = guild.get_member(user_id)
+        if member is not None:
+            return member
+
+        key = (guild.id, user_id)
+        entry = self._members.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[1] > self.ttl:
+            del self._members[key]
+            return None
+
+        self._members.move_to_end(key)
+        return entry[0]
+
+    async def resolve_many(self, guild: discord.Guild, user_ids: list):
+        """(members, missing ids): cache hits first, the misses fetched concurrently"""
+        found = {}
+        misses = []
+        for user_id in user_ids:
+            member = self.get(guild, user_id)
+            if member is None:
+                misses.append(user_id)
+            else:
+                self.hits += 1
+                found[user_id] = member
+        if misses:
+            results = await asyncio.gather(*(self.resolve(guild, i) for i in misses), return_exceptions=True)
+            for user_id, member in zip(misses, results):
+                if member is not None and not isinstance(member, BaseException):
+                    found[user_id] = member
+        members = [found[user_id] for user_id in user_ids if user_id in found]
+        return members, [user_id for user_id in user_ids if user_id not in found]
+
+    async def resolve(self, guild: discord.Guild, user_id: int):
+        """Member from the caches, falling back to fetch_member; None if not in the guild"""
+        member = self.get(guild, user_id)
+        if member is not None:
+            self.hits += 1
+            return member
+
+        self.misses += 1
+        key = (guild.id, user_id)
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            try:
+                member = await guild.fetch_member(user_id)
+            except discord.NotFound:
+                member = None
+            if member is not None:
+                self.remember(member)
+            future.set_result(member)
+            return member
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved, waiters re-raise it themselves
+            raise
+        finally:
+            del self._inflight[key]
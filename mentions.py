@@ -0,0 +1,14 @@
+import re
+
+# <@123> or <@!123>, or a bare snowflake that isn't part of a role/channel mention or a longer number
+USER_REFERENCE = re.compile(r"<@!?(\d{15,21})>|(?<![<@&#!\d])(\d{15,21})(?!\d)")
+
+
+def parse_user_ids(text: str) -> list:
+    """Every distinct user id mentioned or pasted in `text`, in order"""
+    ids = []
+    for mention, raw in USER_REFERENCE.findall(text or ""):
+        user_id = int(mention or raw)
+        if user_id not in ids:
+            ids.append(user_id)
+    return ids
@@ -0,0 +1,220 @@
+import bisect
+import contextvars
+import functools
+import logging
+import time
+
+import discord
+
+# Handler and REST latency buckets in seconds; 3s is Discord's interaction deadline
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+# Time-to-first-staff-response buckets in seconds, 30s up to a day
+RESPONSE_BUCKETS = (30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 14400, 43200, 86400)
+
+# Route template of the REST request running in the current task (read by the 429 log hook)
+current_route = contextvars.ContextVar("current_route", default=None)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}   # label values -> count
+
+    def inc(self, *labels, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram; observe() is a bisect plus two additions"""
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}   # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, series in self._series.items():
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                total += count
+                label_text = _labels(self.labels + ("le",), labels + (bound,))
+                yield f"{self.name}_bucket{label_text} {total}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {series[-1]}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {total}"
+
+
+class Gauge:
+    """Value read from a callback at scrape time, so nothing is updated on the hot path
+
+    With kind="counter" the value is a running total kept elsewhere (it only
+    goes up, and restarts from zero with the process).
+    """
+
+    def __init__(self, name: str, help: str, read, kind: str = "gauge"):
+        self.name = name
+        self.help = help
+        self.read = read
+        self.kind = kind
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield f"{self.name} {self.read()}"
+
+
+class Metrics:
+    """Everything /metrics exposes, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.handler_seconds = Histogram(
+            "ticket_handler_seconds", "Time spent in an interaction handler", ("kind", "handler"))
+        self.interaction_lag_seconds = Histogram(
+            "ticket_interaction_lag_seconds", "Time from interaction creation until its handler started", ("kind", "handler"))
+        self.handler_errors = Counter(
+            "ticket_handler_errors_total", "Handlers that raised, by exception type", ("kind", "handler", "error"))
+        self.interactions_expired = Counter(
+            "ticket_interactions_expired_total", "Responses rejected because the 3s interaction deadline had passed", ("handler",))
+        self.rest_seconds = Histogram(
+            "discord_rest_seconds", "Discord REST request latency including rate-limit waits", ("method", "route"))
+        self.rest_errors = Counter(
+            "discord_rest_errors_total", "Discord REST requests that failed, by status", ("method", "route", "status"))
+        self.rate_limited = Counter(
+            "discord_rate_limited_total", "429 responses from Discord", ("route", "scope"))
+        self.rate_limit_wait = Histogram(
+            "discord_rate_limit_wait_seconds", "Retry-After waited out after a 429", ("route",))
+        self.throttled = Counter(
+            "ticket_throttled_total", "Interactions rejected by the per-user/per-guild throttle", ("action", "scope"))
+        self.first_response_seconds = Histogram(
+            "ticket_first_response_seconds", "Time from ticket creation to the first staff message",
+            ("type", "routing"), buckets=RESPONSE_BUCKETS)
+        self._metrics = [
+            self.first_response_seconds, self.handler_seconds, self.interaction_lag_seconds, self.handler_errors, self.interactions_expired,
+            self.rest_seconds, self.rest_errors, self.rate_limited, self.rate_limit_wait, self.throttled
+        ]
+
+    def gauge(self, name: str, help: str, read):
+        self._metrics.append(Gauge(name, help, read))
+
+    def counter(self, name: str, help: str, read):
+        """A running total read at scrape time; `name` should end in _total"""
+        self._metrics.append(Gauge(name, help, read, kind="counter"))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    # ---------- instrumentation ----------
+
+    def instrument(self, kind: str, name: str = None):
+        """Decorator timing an interaction handler (app command, component callback or modal submit)
+
+        Put it directly on the function, below any app_commands decorators.
+        """
+        def decorator(func):
+            handler = name or func.__name__
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                interaction = next(arg for arg in args if isinstance(arg, discord.Interaction))
+                started = time.perf_counter()
+                lag = (discord.utils.utcnow() - interaction.created_at).total_seconds()
+                self.interaction_lag_seconds.observe(max(0.0, lag), kind, handler)
+                try:
+                    return await func(*args, **kwargs)
+                except discord.NotFound as e:
+                    if e.code == 10062:  # Unknown interaction: answered too late
+                        self.interactions_expired.inc(handler)
+                    self.handler_errors.inc(kind, handler, type(e).__name__)
+                    raise
+                except Exception as e:
+                    self.handler_errors.inc(kind, handler, type(e).__name__)
+                    raise
+                finally:
+                    self.handler_seconds.observe(time.perf_counter() - started, kind, handler)
+            return wrapper
+        return decorator
+
+    def instrument_rest(self, http):
+        """Wrap discord.py's HTTPClient.request so every REST call is timed"""
+        request = http.request
+
+        @functools.wraps(request)
+        async def timed_request(route, **kwargs):
+            token = current_route.set(route.path)
+            started = time.perf_counter()
+            try:
+                return await request(route, **kwargs)
+            except discord.HTTPException as e:
+                self.rest_errors.inc(route.method, route.path, e.status)
+                raise
+            finally:
+                self.rest_seconds.observe(time.perf_counter() - started, route.method, route.path)
+                current_route.reset(token)
+
+        http.request = timed_request
+
+    def rate_limit_handler(self) -> logging.Handler:
+        """Log handler for 'discord.http' that counts the 429s discord.py reports"""
+        metrics = self
+
+        class RateLimitHandler(logging.Handler):
+            def emit(self, record):
+                message = record.msg
+                if not isinstance(message, str):
+                    return
+                if "responded with 429" in message:
+                    route = current_route.get() or "unknown"
+                    metrics.rate_limited.inc(route, "route")
+                    if "Retrying in" in message:
+                        metrics.rate_limit_wait.observe(float(record.args[-1]), route)
+                elif message.startswith("Global rate limit has been hit"):
+                    metrics.rate_limited.inc(current_route.get() or "unknown", "global")
+
+        return RateLimitHandler(level=logging.WARNING)
+
+
+async def serve(metrics: Metrics, host: str, port: int):
+    """Expose GET /metrics on a local port (returns the aiohttp runner)"""
+    from aiohttp import web
+
+    async def scrape(request):
+        return web.Response(text=metrics.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", scrape)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
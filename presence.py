@@ -0,0 +1,88 @@
+import time
+from collections import deque
+
+import discord
+
+
+class PresenceScheduler:
+    """Decides whether a status rotation tick actually sends a presence update
+
+    Presence updates share the gateway send budget with everything else the
+    bot does, so a tick is skipped when the activity would not change, when
+    the budget for the current window is used up, or while an admin pin is
+    active. The tick interval backs off while nothing is happening.
+    """
+
+    def __init__(self, rotation, base_interval: float, max_interval: float, budget: int, window: float):
+        self.rotation = rotation          # static status texts; "{open}" is filled with the ticket count
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.interval = base_interval
+        self.budget = budget
+        self.window = window
+
+        self.sent = 0
+        self.skipped = 0
+
+        self._position = 0
+        self._pinned = None
+        self._last_key = None
+        self._marker = None
+        self._sends = deque()
+
+    @staticmethod
+    def _key(activity: discord.BaseActivity, status: discord.Status):
+        return (activity.type, activity.name, status)
+
+    @property
+    def pinned(self) -> bool:
+        return self._pinned is not None
+
+    def pin(self, activity: discord.BaseActivity, status: discord.Status = discord.Status.online):
+        """Hold an admin-chosen presence until release()"""
+        self._pinned = (activity, status)
+
+    def release(self):
+        self._pinned = None
+        self.interval = self.base_interval
+
+    def mark_sent(self, activity: discord.BaseActivity, status: discord.Status = discord.Status.online):
+        """Record a presence that was sent outside the scheduler"""
+        self._last_key = self._key(activity, status)
+        self._sends.append(time.monotonic())
+        self.sent += 1
+
+    def _has_budget(self, now: float) -> bool:
+        while self._sends and now - self._sends[0] > self.window:
+            self._sends.popleft()
+        return len(self._sends) < self.budget
+
+    def next(self, open_total: int, marker):
+        """Return (activity, status) to send now, or None to skip this tick
+
+        `marker` is anything that changes when tickets open or close; while it
+        stays the same the interval doubles up to max_interval.
+        """
+        if marker == self._marker:
+            self.interval = min(self.interval * 2, self.max_interval)
+        else:
+            self._marker = marker
+            self.interval = self.base_interval
+
+        if self._pinned:
+            activity, status = self._pinned
+        else:
+            text = self.rotation[self._position % len(self.rotation)]
+            self._position += 1
+            activity, status = discord.Game(name=text.format(open=open_total)), discord.Status.online
+
+        now = time.monotonic()
+        key = self._key(activity, status)
+        if key == self._last_key or not self._has_budget(now):
+            self.skipped += 1
+            return None
+
+        self._last_key = key
+        self._sends.append(now)
+        self.sent += 1
+        return activity, status
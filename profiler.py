@@ -0,0 +1,92 @@
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+
+
+def _frame_name(code, lineno: int) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{lineno})"
+
+
+def _thread_stack(frame) -> list:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_name(frame.f_code, frame.f_lineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def _task_stack(task: asyncio.Task) -> list:
+    """Where a suspended task is waiting, outermost coroutine first"""
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(_frame_name(frame.f_code, frame.f_lineno))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return stack
+
+
+class SamplingProfiler:
+    """Samples the event loop thread and its suspended tasks from a side thread
+
+    On-CPU samples show what the loop thread is executing; `await` samples
+    show where each pending task is parked, which is where async time goes
+    (REST calls, locks, sleeps). The side thread can only look when the loop
+    thread lets go of the GIL, so short CPU bursts are under-counted while
+    anything blocking the loop for more than a switch interval shows up.
+    Output is collapsed stacks, one "frame;frame;frame count" line per
+    distinct stack, which flamegraph.pl, speedscope and inferno read directly.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.taken = 0
+
+    def _sample(self, thread_id: int, loop: asyncio.AbstractEventLoop):
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            self.samples[";".join(["cpu"] + _thread_stack(frame))] += 1
+
+        try:
+            tasks = list(asyncio.all_tasks(loop))
+        except RuntimeError:
+            return  # Task set changed while copying it; skip this round
+        for task in tasks:
+            if task.done():
+                continue
+            # Not keyed by task name: names like Task-1234 are unique per task
+            # and would keep identical stacks from adding up
+            stack = _task_stack(task)
+            if stack:
+                self.samples[";".join(["await"] + stack)] += 1
+
+    async def run(self, seconds: float) -> str:
+        """Profile the running loop for `seconds` and return the collapsed stacks"""
+        loop = asyncio.get_running_loop()
+        thread_id = threading.get_ident()
+        stop = threading.Event()
+
+        def sampler():
+            deadline = time.monotonic() + seconds
+            while not stop.is_set() and time.monotonic() < deadline:
+                self._sample(thread_id, loop)
+                self.taken += 1
+                time.sleep(self.interval)
+
+        worker = threading.Thread(target=sampler, name="sampling-profiler", daemon=True)
+        worker.start()
+        try:
+            await asyncio.to_thread(worker.join)
+        finally:
+            stop.set()
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
@@ -0,0 +1,132 @@
+import asyncio
+import datetime
+import re
+import time
+
+import discord
+
+# ticket-0042-username, as named by open_ticket_channel
+TICKET_CHANNEL = re.compile(r"^ticket-(\d+)-(.+)$")
+MENTION = re.compile(r"<@!?(\d+)>")
+
+
+def parse_ticket_channel(name: str):
+    """(number, username) from a ticket channel name, or None"""
+    match = TICKET_CHANNEL.match(name)
+    if match is None:
+        return None
+    return int(match.group(1)), match.group(2)
+
+
+def _naive(when: datetime.datetime) -> str:
+    return when.replace(tzinfo=None).isoformat()
+
+
+def creator_candidates(channel: discord.TextChannel, username: str, exclude: set) -> list:
+    """Member overwrites that could belong to the ticket creator, best match first
+
+    Staff and the bot are excluded. Users added later also have overwrites,
+    so a member whose cached name matches the channel name wins.
+    """
+    candidates = []
+    for target in channel.overwrites:
+        is_member = isinstance(target, discord.Member) or (
+            isinstance(target, discord.Object) and target.type is discord.Member
+        )
+        if not is_member or target.id in exclude:
+            continue
+        if isinstance(target, discord.Member) and target.name.lower() == username:
+            candidates.insert(0, target.id)
+        else:
+            candidates.append(target.id)
+    return candidates
+
+
+async def welcome_mention(channel: discord.TextChannel):
+    """Creator id from the bot's welcome embed, the first message of every ticket"""
+    async for message in channel.history(limit=1, oldest_first=True):
+        for embed in message.embeds:
+            match = MENTION.search(embed.description or "")
+            if match:
+                return int(match.group(1))
+    return None
+
+
+async def reconcile_guild(guild: discord.Guild, settings, store, staff: set, ticket_types: dict, concurrency: int) -> dict:
+    """Bring the store in line with the ticket channels that actually exist
+
+    One pass over the guild's ticket categories from the gateway cache:
+    channels the store doesn't know are recovered from their name, category
+    and overwrites (creation time and last activity come from snowflakes)
+    without counting as new opens, and open tickets whose channel is gone
+    are closed and listed in 'stale' so the caller can drop their logs.
+    Only channels whose creator can't be told from the overwrites need a
+    history request, and those run concurrently under a semaphore. Channels
+    renamed with /rename have lost their number and are left alone.
+    """
+    started = time.perf_counter()
+    now = datetime.datetime.utcnow().isoformat()
+    types_by_category = {category_id: key for key, category_id in settings.categories.items() if category_id}
+    exclude = set(staff) | {guild.me.id}
+    report = {'scanned': 0, 'known': 0, 'recovered': 0, 'enriched': 0, 'unresolved': 0, 'closed': 0}
+
+    pending = []   # (channel, ticket type, number, candidates) needing a creator
+    for category_id, ticket_type in types_by_category.items():
+        category = guild.get_channel(category_id)
+        if not isinstance(category, discord.CategoryChannel):
+            continue
+        for channel in category.text_channels:
+            parsed = parse_ticket_channel(channel.name)
+            if parsed is None:
+                continue
+            report['scanned'] += 1
+            if channel.id in store:
+                report['known'] += 1
+                continue
+            number, username = parsed
+            pending.append((channel, ticket_type, number, creator_candidates(channel, username, exclude)))
+
+    slots = asyncio.Semaphore(concurrency)
+
+    async def recover(channel, ticket_type, number, candidates):
+        creator_id = candidates[0] if len(candidates) == 1 else None
+        if creator_id is None:
+            async with slots:
+                try:
+                    creator_id = await welcome_mention(channel)
+                except discord.HTTPException:
+                    creator_id = None
+            report['enriched'] += 1
+            if creator_id is None and candidates:
+                creator_id = candidates[0]
+        if creator_id is None:
+            report['unresolved'] += 1
+            return None
+
+        ticket = store.add(
+            channel.id, guild.id, creator_id, ticket_type,
+            ticket_types.get(ticket_type, {}).get('name', ticket_type), _naive(channel.created_at),
+            number=number, restored=True
+        )
+        if channel.last_message_id:
+            store.touch(channel.id, _naive(discord.utils.snowflake_time(channel.last_message_id)))
+        store.ensure_sequence(store.sequence_name(guild.id, ticket_type), number)
+        report['recovered'] += 1
+        return ticket
+
+    results = await asyncio.gather(*(recover(*entry) for entry in pending))
+    recovered = [ticket for ticket in results if ticket is not None]
+
+    # Open tickets whose channel was deleted while the bot was offline
+    stale = []
+    for ticket in list(store.open_tickets()):
+        if ticket['guild_id'] == guild.id and guild.get_channel(ticket['channel_id']) is None:
+            store.close(ticket['channel_id'], now)
+            stale.append(ticket['channel_id'])
+    report['closed'] = len(stale)
+
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    report['tickets'] = recovered
+    report['stale'] = stale
+    return report
+
@@ -0,0 +1,101 @@
+import datetime
+import heapq
+import itertools
+import time
+
+
+class StaffRouter:
+    """Assigns waiting tickets to the least-loaded available support member
+
+    Each guild has a priority queue of unassigned tickets ordered by type
+    priority, then age. dispatch() pops tickets while someone is available
+    and under `max_load`. Loads are read from the ticket store. Availability
+    is the gateway presence when presences are tracked. Otherwise it is
+    having spoken within `active_window` seconds. Closed or already-claimed
+    tickets are skipped when they surface instead of being removed from the
+    heap.
+    """
+
+    def __init__(self, store, priorities: dict, max_load: int, active_window: float):
+        self.store = store
+        self.priorities = priorities   # ticket type -> rank, lower is served first
+        self.max_load = max_load
+        self.active_window = active_window
+        self._queues = {}    # guild_id -> heap of (rank, created_at, seq, channel_id)
+        self._seq = itertools.count()
+        self._online = {}    # (guild_id, staff_id) -> online per gateway presence
+        self._seen = {}      # (guild_id, staff_id) -> monotonic time they last spoke
+        self._last_assigned = {}  # (guild_id, staff_id) -> seq of their latest assignment (ties go to whoever waited longest)
+
+    def depth(self, guild_id: int = None) -> int:
+        if guild_id is not None:
+            return len(self._queues.get(guild_id, ()))
+        return sum(len(queue) for queue in self._queues.values())
+
+    def enqueue(self, ticket: dict):
+        rank = self.priorities.get(ticket['type'], len(self.priorities))
+        heapq.heappush(
+            self._queues.setdefault(ticket['guild_id'], []),
+            (rank, ticket['created_at'], next(self._seq), ticket['channel_id'])
+        )
+
+    def restore(self, tickets):
+        """Queue every open ticket nobody has been assigned to yet (after a restart)"""
+        for ticket in tickets:
+            if not ticket.get('assigned_to'):
+                self.enqueue(ticket)
+
+    def set_online(self, guild_id: int, staff_id: int, online: bool):
+        self._online[guild_id, staff_id] = online
+
+    def seen(self, guild_id: int, staff_id: int):
+        self._seen[guild_id, staff_id] = time.monotonic()
+
+    def forget(self, guild_id: int, staff_id: int):
+        self._online.pop((guild_id, staff_id), None)
+        self._seen.pop((guild_id, staff_id), None)
+        self._last_assigned.pop((guild_id, staff_id), None)
+
+    def available(self, guild_id: int, staff_ids) -> list:
+        now = time.monotonic()
+        return [
+            staff_id for staff_id in staff_ids
+            if (self._online.get((guild_id, staff_id))
+                or now - self._seen.get((guild_id, staff_id), -self.active_window) < self.active_window)
+            and self.store.load_of(guild_id, staff_id) < self.max_load
+        ]
+
+    def dispatch(self, guild_id: int, staff_ids) -> list:
+        """Assign queued tickets in priority order, returning [(ticket, staff_id)]"""
+        queue = self._queues.get(guild_id)
+        if not queue:
+            return []
+        candidates = self.available(guild_id, staff_ids)
+        assignments = []
+        while queue and candidates:
+            channel_id = heapq.heappop(queue)[3]
+            ticket = self.store.get(channel_id)
+            if ticket is None or ticket.get('assigned_to'):
+                continue
+            staff_id = min(candidates, key=lambda sid: (
+                self.store.load_of(guild_id, sid), self._last_assigned.get((guild_id, sid), -1)
+            ))
+            self.store.assign(channel_id, staff_id)
+            self._last_assigned[guild_id, staff_id] = next(self._seq)
+            assignments.append((ticket, staff_id))
+            if self.store.load_of(guild_id, staff_id) >= self.max_load:
+                candidates.remove(staff_id)
+        return assignments
+
+    def first_response(self, ticket: dict, staff_id: int, when: datetime.datetime):
+        """Record a staff reply; returns seconds since the ticket opened if it was the first
+
+        An unassigned ticket is claimed by whoever answered it.
+        """
+        stamp = when.replace(tzinfo=None).isoformat()
+        if not self.store.mark_first_response(ticket['channel_id'], stamp):
+            return None
+        if not ticket.get('assigned_to'):
+            self.store.assign(ticket['channel_id'], staff_id)
+        created = datetime.datetime.fromisoformat(ticket['created_at'])
+        return max(0.0, (when.replace(tzinfo=None) - created).total_seconds())
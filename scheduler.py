@@ -0,0 +1,142 @@
+import asyncio
+import datetime
+import heapq
+
+
+class IdleScheduler:
+    """Deadline heap for idle-ticket reminders and auto-close
+
+    Each open ticket has at most one entry, keyed on its next deadline. When
+    an entry comes due the scheduler re-reads the ticket's last activity: if
+    there was activity since, the entry is simply pushed back. Messages only
+    touch the heap for a ticket left without an entry (reminded, with
+    auto-close off), so the cost scales with deadlines that come due rather
+    than with tickets or messages. Nothing fires before `ready` (the gateway
+    cache) completes, and a reminder or close that could not be carried out
+    is retried after `retry_after` instead of being dropped.
+    """
+
+    def __init__(self, store, remind_after: float, close_after: float, on_remind, on_close, ready=None,
+                 retry_after: float = 300):
+        self.store = store
+        self.remind_after = datetime.timedelta(hours=remind_after) if remind_after else None
+        self.close_after = datetime.timedelta(hours=close_after) if close_after else None
+        self.on_remind = on_remind    # async (ticket) -> whether the reminder was sent
+        self.on_close = on_close      # async (ticket) -> whether the close was started
+        self.ready = ready            # async () -> None, awaited before the first deadline fires
+        self.retry_after = datetime.timedelta(seconds=retry_after)
+        self._heap = []               # (deadline, channel_id)
+        self._scheduled = set()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.remind_after or self.close_after)
+
+    def start(self):
+        """Seed one deadline per open ticket and start the timer task"""
+        if not self.enabled:
+            return
+        for ticket in self.store.open_tickets():
+            self.schedule(ticket)
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    def _next_deadline(self, ticket):
+        last = datetime.datetime.fromisoformat(ticket['last_activity'] or ticket['created_at'])
+        # A reminder only counts if it was sent during the current idle stretch
+        reminded = ticket.get('reminded_at') and ticket['reminded_at'] >= (ticket['last_activity'] or ticket['created_at'])
+
+        if self.remind_after and not reminded:
+            return last + self.remind_after
+        if self.close_after:
+            return last + self.close_after
+        return None
+
+    def schedule(self, ticket):
+        """Add a deadline for a ticket that has none (new or restored)"""
+        if not self.enabled or ticket['channel_id'] in self._scheduled:
+            return
+        deadline = self._next_deadline(ticket)
+        if deadline is None:
+            return
+        self._scheduled.add(ticket['channel_id'])
+        heapq.heappush(self._heap, (deadline, ticket['channel_id']))
+        if self._heap[0][1] == ticket['channel_id']:
+            self._wakeup.set()
+
+    def activity(self, channel_id: int):
+        """Re-arm a ticket that has no deadline left once someone talks in it again
+
+        With auto-close off a reminded ticket leaves the heap; new activity
+        starts a fresh idle stretch that deserves its own reminder.
+        """
+        if channel_id in self._scheduled or not self.enabled:
+            return
+        ticket = self.store.get(channel_id)
+        if ticket is not None:
+            self.schedule(ticket)
+
+    def retry(self, ticket):
+        """Try a ticket's due deadline again later (the channel couldn't be reached)"""
+        channel_id = ticket['channel_id']
+        if channel_id not in self.store or channel_id in self._scheduled:
+            return
+        self._scheduled.add(channel_id)
+        heapq.heappush(self._heap, (datetime.datetime.utcnow() + self.retry_after, channel_id))
+        if self._heap[0][1] == channel_id:
+            self._wakeup.set()
+
+    async def _run(self):
+        if self.ready is not None:
+            await self.ready()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = (self._heap[0][0] - datetime.datetime.utcnow()).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, channel_id = heapq.heappop(self._heap)
+            self._scheduled.discard(channel_id)
+            ticket = self.store.get(channel_id)
+            if ticket is None:
+                continue  # Closed in the meantime
+
+            try:
+                await self._fire(ticket)
+            except Exception as e:
+                print(f"❌ Idle scheduler failed for {channel_id}: {e}")
+                self.retry(ticket)
+
+    async def _fire(self, ticket):
+        now = datetime.datetime.utcnow()
+        idle_for = now - datetime.datetime.fromisoformat(ticket['last_activity'] or ticket['created_at'])
+        reminded = ticket.get('reminded_at') and ticket['reminded_at'] >= (ticket['last_activity'] or ticket['created_at'])
+
+        if self.close_after and idle_for >= self.close_after and (reminded or not self.remind_after):
+            if not await self.on_close(ticket):
+                self.retry(ticket)
+            return
+
+        if self.remind_after and idle_for >= self.remind_after and not reminded:
+            if not await self.on_remind(ticket):
+                self.retry(ticket)
+                return
+            # Only a reminder that was actually posted starts the close countdown
+            self.store.mark_reminded(ticket['channel_id'], now.isoformat())
+
+        # Activity moved the deadline, or the next stage is still ahead
+        if ticket['channel_id'] in self.store:
+            self.schedule(ticket)
@@ -0,0 +1,28 @@
+import re
+
+
+# "[2026-01-31 12:00:00] " prefixes and the transcript banner carry no useful terms
+LINE_PREFIX = re.compile(r"^\[\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}\] ", re.MULTILINE)
+BANNER = re.compile(r"^(=+|GODBATTLE TICKET TRANSCRIPT|END OF TRANSCRIPT|Generated: .*)$", re.MULTILINE)
+TERM = re.compile(r"[\w#@.-]+\*?", re.UNICODE)
+
+
+def searchable_text(transcript: str) -> str:
+    """Strip timestamps and banners from a transcript before it is indexed"""
+    return BANNER.sub("", LINE_PREFIX.sub("", transcript))
+
+
+def build_query(text: str):
+    """Turn free text from a slash command into a safe FTS5 query
+
+    Every term is quoted so user input can't inject FTS syntax; terms are
+    ANDed together and a trailing * keeps its prefix-match meaning.
+    Returns None when there is nothing searchable in the input.
+    """
+    terms = []
+    for term in TERM.findall(text):
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', "")
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms) or None
@@ -0,0 +1,182 @@
+import bisect
+import datetime
+
+
+# Ticket lifetime histogram edges in seconds: 1 minute growing by 1.5x up to ~3 months
+LIFETIME_EDGES = [60 * 1.5 ** i for i in range(30)]
+
+
+def _parse(timestamp) -> datetime.datetime:
+    if isinstance(timestamp, datetime.datetime):
+        return timestamp
+    return datetime.datetime.fromisoformat(timestamp)
+
+
+class RingSeries:
+    """Fixed-size ring of time buckets holding opens, closes and lifetime totals
+
+    Buckets are reused in place as time moves on, so the series never grows
+    and recording is O(1).
+    """
+
+    def __init__(self, width: int, size: int):
+        self.width = width  # seconds per bucket
+        self.size = size
+        self._index = [None] * size
+        self._opens = [0] * size
+        self._closes = [0] * size
+        self._lifetime = [0.0] * size
+
+    def _slot(self, when: datetime.datetime) -> int:
+        index = int(when.replace(tzinfo=datetime.timezone.utc).timestamp()) // self.width
+        slot = index % self.size
+        if self._index[slot] != index:
+            if self._index[slot] is not None and self._index[slot] > index:
+                return None  # Older than anything the ring still holds
+            self._index[slot] = index
+            self._opens[slot] = self._closes[slot] = 0
+            self._lifetime[slot] = 0.0
+        return slot
+
+    def record_open(self, when: datetime.datetime):
+        slot = self._slot(when)
+        if slot is not None:
+            self._opens[slot] += 1
+
+    def record_close(self, when: datetime.datetime, lifetime: float):
+        slot = self._slot(when)
+        if slot is not None:
+            self._closes[slot] += 1
+            self._lifetime[slot] += lifetime
+
+    def totals(self, now: datetime.datetime, buckets: int, offset: int = 0):
+        """Sum (opens, closes, lifetime) over `buckets` buckets ending `offset` buckets ago"""
+        newest = int(now.replace(tzinfo=datetime.timezone.utc).timestamp()) // self.width - offset
+        opens = closes = 0
+        lifetime = 0.0
+        for index in range(newest - buckets + 1, newest + 1):
+            slot = index % self.size
+            if self._index[slot] == index:
+                opens += self._opens[slot]
+                closes += self._closes[slot]
+                lifetime += self._lifetime[slot]
+        return opens, closes, lifetime
+
+
+class TicketStats:
+    """Ticket counters kept up to date as tickets open and close
+
+    Everything /stats and the presence rotation need is precomputed here, so
+    reading it never iterates over tickets.
+    """
+
+    def __init__(self):
+        self.open_by_type = {}
+        self.opened_by_type = {}
+        self.closed_by_type = {}
+        self.open_total = 0
+        self.changes = 0  # bumped on every open/close, cheap "did anything happen" marker
+        self.hourly = RingSeries(width=3600, size=24 * 7)
+        self.daily = RingSeries(width=86400, size=30)
+        self._lifetimes = [0] * (len(LIFETIME_EDGES) + 1)
+        self._lifetime_count = 0
+
+    def record_open(self, ticket_type: str, created_at, restored: bool = False):
+        """Count a newly opened ticket (restored=True for tickets loaded at startup)"""
+        self.open_by_type[ticket_type] = self.open_by_type.get(ticket_type, 0) + 1
+        self.open_total += 1
+        self.changes += 1
+        if not restored:
+            self.record_history_open(ticket_type, created_at)
+
+    def record_close(self, ticket_type: str, created_at, closed_at):
+        if self.open_by_type.get(ticket_type):
+            self.open_by_type[ticket_type] -= 1
+            self.open_total -= 1
+        self.changes += 1
+        self.record_history_close(ticket_type, created_at, closed_at)
+
+    def record_history_open(self, ticket_type: str, created_at):
+        created_at = _parse(created_at)
+        self.opened_by_type[ticket_type] = self.opened_by_type.get(ticket_type, 0) + 1
+        self.hourly.record_open(created_at)
+        self.daily.record_open(created_at)
+
+    def record_history_close(self, ticket_type: str, created_at, closed_at):
+        created_at, closed_at = _parse(created_at), _parse(closed_at)
+        lifetime = max(0.0, (closed_at - created_at).total_seconds())
+        self.closed_by_type[ticket_type] = self.closed_by_type.get(ticket_type, 0) + 1
+        self.hourly.record_close(closed_at, lifetime)
+        self.daily.record_close(closed_at, lifetime)
+        self._lifetimes[bisect.bisect_left(LIFETIME_EDGES, lifetime)] += 1
+        self._lifetime_count += 1
+
+    def lifetime_percentile(self, q: float):
+        """Approximate lifetime percentile in seconds (upper bucket edge)"""
+        if not self._lifetime_count:
+            return None
+        target = q * self._lifetime_count
+        seen = 0
+        for i, count in enumerate(self._lifetimes):
+            seen += count
+            if seen >= target and count:
+                return LIFETIME_EDGES[i] if i < len(LIFETIME_EDGES) else LIFETIME_EDGES[-1]
+        return LIFETIME_EDGES[-1]
+
+    def week_trend(self, now: datetime.datetime = None) -> dict:
+        """Opens/closes over the last 7 days compared with the 7 days before"""
+        now = now or datetime.datetime.utcnow()
+        opens, closes, lifetime = self.daily.totals(now, 7)
+        prev_opens, prev_closes, _ = self.daily.totals(now, 7, offset=7)
+        return {
+            'opens': opens,
+            'closes': closes,
+            'avg_lifetime': lifetime / closes if closes else None,
+            'prev_opens': prev_opens,
+            'prev_closes': prev_closes
+        }
+
+    def last_24h(self, now: datetime.datetime = None):
+        now = now or datetime.datetime.utcnow()
+        opens, closes, _ = self.hourly.totals(now, 24)
+        return opens, closes
+
+
+class GuildStats:
+    """TicketStats per guild plus a bot-wide total, fed with the same events"""
+
+    def __init__(self):
+        self.all = TicketStats()
+        self._guilds = {}   # guild_id -> TicketStats
+
+    def get(self, guild_id: int) -> TicketStats:
+        stats = self._guilds.get(guild_id)
+        if stats is None:
+            stats = self._guilds[guild_id] = TicketStats()
+        return stats
+
+    def record_open(self, guild_id: int, ticket_type: str, created_at, restored: bool = False):
+        self.all.record_open(ticket_type, created_at, restored)
+        self.get(guild_id).record_open(ticket_type, created_at, restored)
+
+    def record_close(self, guild_id: int, ticket_type: str, created_at, closed_at):
+        self.all.record_close(ticket_type, created_at, closed_at)
+        self.get(guild_id).record_close(ticket_type, created_at, closed_at)
+
+    def record_history_open(self, guild_id: int, ticket_type: str, created_at):
+        self.all.record_history_open(ticket_type, created_at)
+        self.get(guild_id).record_history_open(ticket_type, created_at)
+
+    def record_history_close(self, guild_id: int, ticket_type: str, created_at, closed_at):
+        self.all.record_history_close(ticket_type, created_at, closed_at)
+        self.get(guild_id).record_history_close(ticket_type, created_at, closed_at)
+
+
+def format_duration(seconds) -> str:
+    if seconds is None:
+        return "n/a"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
@@ -0,0 +1,509 @@
+import asyncio
+import json
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    channel_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    closed_at TEXT,
+    closed_by INTEGER,
+    number INTEGER,
+    last_activity TEXT,
+    reminded_at TEXT,
+    guild_id INTEGER,
+    assigned_to INTEGER,
+    first_response_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_user ON tickets(user_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_type ON tickets(type);
+CREATE INDEX IF NOT EXISTS idx_tickets_open ON tickets(closed_at);
+CREATE TABLE IF NOT EXISTS sequences (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    digest TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    ticket_number INTEGER,
+    channel_id INTEGER NOT NULL,
+    creator_id INTEGER,
+    type TEXT,
+    closed_at TEXT NOT NULL,
+    closed_by INTEGER,
+    guild_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_transcripts_number ON transcripts(ticket_number);
+CREATE INDEX IF NOT EXISTS idx_transcripts_channel ON transcripts(channel_id);
+CREATE INDEX IF NOT EXISTS idx_transcripts_creator ON transcripts(creator_id);
+CREATE INDEX IF NOT EXISTS idx_transcripts_type ON transcripts(type);
+CREATE INDEX IF NOT EXISTS idx_transcripts_closed ON transcripts(closed_at);
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id INTEGER PRIMARY KEY,
+    settings TEXT NOT NULL
+);
+"""
+
+# Created after the column migrations below, since older databases lack guild_id
+GUILD_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_tickets_guild ON tickets(guild_id);
+CREATE INDEX IF NOT EXISTS idx_transcripts_guild ON transcripts(guild_id);
+"""
+
+# Inverted index over transcript text, rowid = transcripts.id. Contentless,
+# since the text itself already lives in the compressed archive.
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS transcript_search USING fts5(
+    body, content='', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+
+class TicketStore:
+    """SQLite-backed ticket repository
+
+    Open tickets are mirrored in memory so lookups never touch disk. Writes
+    are queued and flushed in batches on a single background thread
+    (write-behind), so interaction handlers never wait on SQLite. Tickets,
+    numbering and transcripts are partitioned by guild.
+    """
+
+    def __init__(self, path: str, stats=None, default_guild_id: int = 0):
+        self.path = path
+        self.stats = stats   # optional GuildStats kept in step with every change
+        self.default_guild_id = default_guild_id  # owner of rows from before multi-guild support
+        self._tickets = {}   # channel_id -> open ticket
+        self._by_user = {}   # (guild_id, user_id) -> channel_id of their open ticket
+        self._reserved = set()  # (guild_id, user_id) with a ticket being created right now
+        self._sequences = {} # sequence name -> last value handed out
+        self._loads = {}     # (guild_id, staff_id) -> open tickets assigned to them
+        self._touched = {}   # channel_id -> last activity not yet written
+        self._meta = {}      # small key/value settings (command hash, ...)
+        self.search_enabled = False
+        self._writes = []    # pending (sql, params) statements
+        self._conn = None
+        # One thread owns the connection, which also serialises every query
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ticket-store")
+        self._flush_lock = asyncio.Lock()
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # ---------- lifecycle ----------
+
+    async def load(self):
+        """Open the database and restore every open ticket into memory"""
+        rows, sequences, history, meta = await self._run(self._load)
+        self._sequences = sequences
+        self._meta = meta
+        self._tickets = {row['channel_id']: row for row in rows}
+        self._by_user = {(row['guild_id'], row['user_id']): row['channel_id'] for row in rows}
+        self._loads = {}
+        for row in rows:
+            if row['assigned_to']:
+                key = (row['guild_id'], row['assigned_to'])
+                self._loads[key] = self._loads.get(key, 0) + 1
+
+        if self.stats is not None:
+            # One pass at startup, after which the counters are maintained incrementally
+            for guild_id, ticket_type, created_at, closed_at in history:
+                self.stats.record_history_open(guild_id, ticket_type, created_at)
+                if closed_at:
+                    self.stats.record_history_close(guild_id, ticket_type, created_at, closed_at)
+            for row in rows:
+                self.stats.record_open(row['guild_id'], row['type'], row['created_at'], restored=True)
+
+        return len(self._tickets)
+
+    def _load(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+        try:
+            self._conn.executescript(SEARCH_SCHEMA)
+            self.search_enabled = True
+        except sqlite3.OperationalError:
+            print("⚠️ SQLite was built without FTS5, transcript search is disabled")
+
+        # Databases created before ticket numbers were stored
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(tickets)")}
+        if 'number' not in columns:
+            self._conn.execute("ALTER TABLE tickets ADD COLUMN number INTEGER")
+        if 'last_activity' not in columns:
+            self._conn.execute("ALTER TABLE tickets ADD COLUMN last_activity TEXT")
+        if 'reminded_at' not in columns:
+            self._conn.execute("ALTER TABLE tickets ADD COLUMN reminded_at TEXT")
+        if 'assigned_to' not in columns:
+            self._conn.execute("ALTER TABLE tickets ADD COLUMN assigned_to INTEGER")
+        if 'first_response_at' not in columns:
+            self._conn.execute("ALTER TABLE tickets ADD COLUMN first_response_at TEXT")
+
+        # Databases from before multi-guild support belong to the configured guild
+        for table in ("tickets", "transcripts"):
+            columns = {row['name'] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if 'guild_id' not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN guild_id INTEGER")
+            with self._conn:
+                self._conn.execute(f"UPDATE {table} SET guild_id = ? WHERE guild_id IS NULL", (self.default_guild_id,))
+        self._conn.executescript(GUILD_INDEXES)
+
+        rows = self._conn.execute(
+            "SELECT channel_id, guild_id, user_id, type, category, created_at, number, last_activity, reminded_at,"
+            " assigned_to, first_response_at FROM tickets WHERE closed_at IS NULL"
+        ).fetchall()
+
+        # Sequences never seen before start after the highest stored number
+        sequences = {
+            self.sequence_name(row['guild_id'], row['type']): row['value'] or 0
+            for row in self._conn.execute("SELECT guild_id, type, MAX(number) AS value FROM tickets GROUP BY guild_id, type")
+        }
+        sequences.update(
+            (row['name'], row['value']) for row in self._conn.execute("SELECT name, value FROM sequences")
+        )
+        history = []
+        if self.stats is not None:
+            history = self._conn.execute("SELECT guild_id, type, created_at, closed_at FROM tickets").fetchall()
+        meta = {row['key']: row['value'] for row in self._conn.execute("SELECT key, value FROM meta")}
+        return [dict(row) for row in rows], sequences, [tuple(row) for row in history], meta
+
+    async def flush(self) -> bool:
+        """Write queued changes to disk in a single transaction, False if it failed and was requeued"""
+        async with self._flush_lock:
+            # Many messages in one ticket between flushes collapse into one update
+            for channel_id, last_activity in self._touched.items():
+                self._writes.append((
+                    "UPDATE tickets SET last_activity = ? WHERE channel_id = ?",
+                    (last_activity, channel_id)
+                ))
+            self._touched = {}
+            writes, self._writes = self._writes, []
+            if writes:
+                try:
+                    await self._run(self._write, writes)
+                except sqlite3.Error as e:
+                    # The transaction rolled back: keep the batch, ahead of anything queued since
+                    self._writes[:0] = writes
+                    print(f"❌ Ticket store flush failed ({len(writes)} write(s) kept for the next try): {e}")
+                    return False
+            return True
+
+    def _write(self, writes):
+        with self._conn:
+            for sql, params in writes:
+                if callable(sql):
+                    sql(self._conn, *params)
+                else:
+                    self._conn.execute(sql, params)
+
+    async def shutdown(self):
+        await self.flush()
+        if self._conn is not None:
+            await self._run(self._conn.close)
+        self._executor.shutdown(wait=True)
+
+    # ---------- meta ----------
+
+    def get_meta(self, key: str, default=None):
+        return self._meta.get(key, default)
+
+    def set_meta(self, key: str, value: str):
+        self._meta[key] = value
+        self._writes.append((
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        ))
+
+    # ---------- guild settings ----------
+
+    async def load_guild_settings(self, guild_id: int):
+        """Stored settings dict of a guild, or None"""
+        await self.flush()
+        row = await self._run(
+            lambda: self._conn.execute("SELECT settings FROM guild_settings WHERE guild_id = ?", (guild_id,)).fetchone()
+        )
+        return json.loads(row['settings']) if row else None
+
+    def save_guild_settings(self, guild_id: int, settings: dict):
+        self._writes.append((
+            "INSERT INTO guild_settings (guild_id, settings) VALUES (?, ?)"
+            " ON CONFLICT(guild_id) DO UPDATE SET settings = excluded.settings",
+            (guild_id, json.dumps(settings))
+        ))
+
+    # ---------- open tickets ----------
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._tickets
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def get(self, channel_id: int):
+        return self._tickets.get(channel_id)
+
+    def open_tickets(self):
+        return self._tickets.values()
+
+    def channel_for_user(self, guild_id: int, user_id: int):
+        """Channel id of the user's open ticket in a guild, if any"""
+        return self._by_user.get((guild_id, user_id))
+
+    def reserve(self, guild_id: int, user_id: int) -> bool:
+        """Claim the user's single ticket slot while their channel is created
+
+        Returns False if the user already has an open or in-flight ticket.
+        Callers must release() the slot once the ticket is added (or failed).
+        """
+        key = (guild_id, user_id)
+        if key in self._by_user or key in self._reserved:
+            return False
+        self._reserved.add(key)
+        return True
+
+    def release(self, guild_id: int, user_id: int):
+        self._reserved.discard((guild_id, user_id))
+
+    @staticmethod
+    def sequence_name(guild_id: int, ticket_type: str) -> str:
+        return f"{guild_id}:{ticket_type}"
+
+    async def next_number(self, name: str) -> int:
+        """Hand out the next value of a persistent sequence
+
+        The increment happens before the first await, so concurrent callers
+        on the event loop can never receive the same number. The new value is
+        committed before it is returned (not left to the write-behind batch),
+        so a crash can't hand it out again after a restart.
+        """
+        value = self._sequences.get(name, 0) + 1
+        self._sequences[name] = value
+        await self._run(self._save_sequence, name, value)
+        return value
+
+    def _save_sequence(self, name: str, value: int):
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO sequences (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)",
+                (name, value)
+            )
+
+    def ensure_sequence(self, name: str, at_least: int):
+        """Move a sequence past a number already in use (e.g. a recovered ticket)"""
+        if self._sequences.get(name, 0) >= at_least:
+            return
+        self._sequences[name] = at_least
+        self._writes.append((
+            "INSERT INTO sequences (name, value) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)",
+            (name, at_least)
+        ))
+
+    def add(self, channel_id: int, guild_id: int, user_id: int, ticket_type: str, category: str, created_at: str,
+            number: int = None, restored: bool = False) -> dict:
+        """Track a new ticket (restored=True for one recovered from an existing channel)"""
+        ticket = {
+            'channel_id': channel_id,
+            'guild_id': guild_id,
+            'user_id': user_id,
+            'type': ticket_type,
+            'category': category,
+            'created_at': created_at,
+            'number': number,
+            'last_activity': created_at,
+            'reminded_at': None,
+            'assigned_to': None,
+            'first_response_at': None
+        }
+        self._tickets[channel_id] = ticket
+        self._by_user[(guild_id, user_id)] = channel_id
+        if self.stats is not None:
+            self.stats.record_open(guild_id, ticket_type, created_at, restored)
+        self._writes.append((
+            "INSERT OR REPLACE INTO tickets (channel_id, guild_id, user_id, type, category, created_at, number, last_activity)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (channel_id, guild_id, user_id, ticket_type, category, created_at, number, created_at)
+        ))
+        return ticket
+
+    def touch(self, channel_id: int, when: str):
+        """Record activity in an open ticket (written on the next flush)"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is not None:
+            ticket['last_activity'] = when
+            self._touched[channel_id] = when
+
+    def mark_reminded(self, channel_id: int, when: str):
+        """Remember that an idle reminder was sent (survives restarts)"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is not None:
+            ticket['reminded_at'] = when
+            self._writes.append(("UPDATE tickets SET reminded_at = ? WHERE channel_id = ?", (when, channel_id)))
+
+    def assign(self, channel_id: int, staff_id: int):
+        """Hand an open ticket to a staff member (None unassigns it)"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is None:
+            return
+        self._unassign(ticket)
+        ticket['assigned_to'] = staff_id
+        if staff_id:
+            key = (ticket['guild_id'], staff_id)
+            self._loads[key] = self._loads.get(key, 0) + 1
+        self._writes.append(("UPDATE tickets SET assigned_to = ? WHERE channel_id = ?", (staff_id, channel_id)))
+
+    def _unassign(self, ticket: dict):
+        staff_id = ticket.get('assigned_to')
+        if staff_id:
+            key = (ticket['guild_id'], staff_id)
+            remaining = self._loads.get(key, 0) - 1
+            if remaining > 0:
+                self._loads[key] = remaining
+            else:
+                self._loads.pop(key, None)
+
+    def load_of(self, guild_id: int, staff_id: int) -> int:
+        """Open tickets currently assigned to a staff member"""
+        return self._loads.get((guild_id, staff_id), 0)
+
+    def mark_first_response(self, channel_id: int, when: str) -> bool:
+        """Record the first staff reply in a ticket, True if this was it"""
+        ticket = self._tickets.get(channel_id)
+        if ticket is None or ticket.get('first_response_at'):
+            return False
+        ticket['first_response_at'] = when
+        self._writes.append(("UPDATE tickets SET first_response_at = ? WHERE channel_id = ?", (when, channel_id)))
+        return True
+
+    def idle_tickets(self, guild_id: int, before: str, limit: int):
+        """Open tickets of a guild with no activity since `before`, longest idle first"""
+        idle = [
+            t for t in self._tickets.values()
+            if t['guild_id'] == guild_id and (t['last_activity'] or t['created_at']) < before
+        ]
+        idle.sort(key=lambda t: t['last_activity'] or t['created_at'])
+        return idle[:limit]
+
+    def close(self, channel_id: int, closed_at: str, closed_by: int = None):
+        """Mark a ticket closed, returning its data if it was open"""
+        ticket = self._tickets.pop(channel_id, None)
+        self._touched.pop(channel_id, None)
+        if ticket is not None:
+            key = (ticket['guild_id'], ticket['user_id'])
+            if self._by_user.get(key) == channel_id:
+                del self._by_user[key]
+            self._unassign(ticket)
+            if self.stats is not None:
+                self.stats.record_close(ticket['guild_id'], ticket['type'], ticket['created_at'], closed_at)
+            self._writes.append((
+                "UPDATE tickets SET closed_at = ?, closed_by = ? WHERE channel_id = ?",
+                (closed_at, closed_by, channel_id)
+            ))
+        return ticket
+
+    # ---------- history ----------
+
+    async def history(self, guild_id: int, user_id: int = None, ticket_type: str = None, limit: int = 25):
+        """Most recent tickets of a guild (open and closed), optionally filtered"""
+        await self.flush()
+        filters = {'guild_id': guild_id, 'user_id': user_id, 'type': ticket_type}
+        return await self._run(self._select, "tickets", filters, "created_at", limit)
+
+    def _select(self, table: str, filters: dict, order_by: str, limit: int):
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn.execute(
+            f"SELECT * FROM {table} {where} ORDER BY {order_by} DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    # ---------- transcript archive index ----------
+
+    def add_transcript(self, archived: dict, ticket: dict, guild_id: int, channel_id: int, closed_at: str,
+                       closed_by: int = None, text: str = None):
+        """Index an archived transcript (see archive.TranscriptArchive)
+
+        When `text` is given it is also added to the full-text search index.
+        A channel has one entry: a retried close updates the earlier one (its
+        search text is kept, as the contentless index can't replace it).
+        """
+        params = (archived['digest'], archived['codec'], archived['size'],
+                  ticket.get('number') if ticket else None, channel_id,
+                  ticket['user_id'] if ticket else None, ticket['type'] if ticket else None,
+                  closed_at, closed_by, guild_id)
+        self._writes.append((self._insert_transcript, (params, text)))
+
+    def _insert_transcript(self, conn, params, text):
+        updated = conn.execute(
+            "UPDATE transcripts SET digest = ?, codec = ?, size = ?, ticket_number = ?, creator_id = ?, type = ?,"
+            " closed_at = ?, closed_by = ?, guild_id = ? WHERE channel_id = ?",
+            params[:4] + params[5:] + (params[4],)
+        )
+        if updated.rowcount:
+            return
+        cursor = conn.execute(
+            "INSERT INTO transcripts (digest, codec, size, ticket_number, channel_id, creator_id, type, closed_at, closed_by, guild_id)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            params
+        )
+        if text and self.search_enabled:
+            conn.execute("INSERT INTO transcript_search (rowid, body) VALUES (?, ?)", (cursor.lastrowid, text))
+
+    async def find_transcripts(self, guild_id: int, number: int = None, ticket_type: str = None, channel_id: int = None,
+                               creator_id: int = None, limit: int = 10):
+        """Archived transcripts of a guild matching every given key, newest first"""
+        await self.flush()
+        filters = {
+            'guild_id': guild_id, 'ticket_number': number, 'type': ticket_type,
+            'channel_id': channel_id, 'creator_id': creator_id
+        }
+        return await self._run(self._select, "transcripts", filters, "closed_at", limit)
+
+    async def search_transcripts(self, query: str, guild_id: int, ticket_type: str = None, limit: int = 10, offset: int = 0):
+        """Rank a guild's archived transcripts against an FTS5 query (see search.build_query)
+
+        Returns (total matches, page of transcript rows best match first).
+        """
+        await self.flush()
+        return await self._run(self._search, query, guild_id, ticket_type, limit, offset)
+
+    def _search(self, query, guild_id, ticket_type, limit, offset):
+        filter_clause = "AND t.guild_id = ?" + (" AND t.type = ?" if ticket_type else "")
+        params = (query, guild_id, ticket_type) if ticket_type else (query, guild_id)
+
+        total = self._conn.execute(
+            f"SELECT COUNT(*) FROM transcript_search s JOIN transcripts t ON t.id = s.rowid"
+            f" WHERE transcript_search MATCH ? {filter_clause}",
+            params
+        ).fetchone()[0]
+
+        rows = self._conn.execute(
+            f"SELECT t.*, bm25(transcript_search) AS score FROM transcript_search s"
+            f" JOIN transcripts t ON t.id = s.rowid"
+            f" WHERE transcript_search MATCH ? {filter_clause}"
+            f" ORDER BY score LIMIT ? OFFSET ?",
+            (*params, limit, offset)
+        ).fetchall()
+        return total, [dict(row) for row in rows]
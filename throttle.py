@@ -0,0 +1,76 @@
+import time
+
+
+def parse_rate(text: str):
+    """'3/60' -> (3, 60.0): three actions per sixty seconds; '' or '0' disables"""
+    text = (text or "").strip()
+    if not text or text == "0":
+        return None
+    count, _, seconds = text.partition("/")
+    count, seconds = int(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        return None
+    return count, seconds
+
+
+class Throttle:
+    """Token buckets per (action, user) and (action, guild)
+
+    Each bucket is stored as a single float, the time at which it will be
+    full again (the GCRA form of a token bucket), so a check is a dict lookup
+    and some arithmetic with no REST or lock involved. Buckets that have
+    refilled completely carry no information and are dropped by a sweep that
+    runs every `sweep_every` checks instead of on a timer.
+    """
+
+    SCOPES = ("user", "guild")
+
+    def __init__(self, rules: dict, sweep_every: int = 1024):
+        # action -> {"user": (count, seconds), "guild": (count, seconds)}
+        self.rules = {}
+        for action, spec in rules.items():
+            rates = (spec or "").split()
+            self.rules[action] = {
+                scope: rate for scope, rate in zip(self.SCOPES, map(parse_rate, rates)) if rate
+            }
+        self.sweep_every = sweep_every
+        self._full_at = {}   # (action, scope, id) -> monotonic time the bucket is full again
+        self._checks = 0
+
+    def __len__(self) -> int:
+        return len(self._full_at)
+
+    def check(self, action: str, user_id: int, guild_id: int = None):
+        """Take a token from every bucket the action uses
+
+        Returns None when allowed, else (scope, seconds until a retry can
+        succeed). Nothing is taken from any bucket when one of them is empty.
+        """
+        rule = self.rules.get(action)
+        if not rule:
+            return None
+        now = time.monotonic()
+        self._checks += 1
+        if self._checks % self.sweep_every == 0:
+            self.sweep(now)
+
+        updates = []
+        for scope in self.SCOPES:
+            rate = rule.get(scope)
+            subject = user_id if scope == "user" else guild_id
+            if rate is None or subject is None:
+                continue
+            count, seconds = rate
+            key = (action, scope, subject)
+            full_at = max(self._full_at.get(key, now), now) + seconds / count
+            if full_at - now > seconds:
+                return scope, full_at - now - seconds
+            updates.append((key, full_at))
+
+        self._full_at.update(updates)
+        return None
+
+    def sweep(self, now: float = None):
+        """Forget buckets that have refilled"""
+        now = time.monotonic() if now is None else now
+        self._full_at = {key: full_at for key, full_at in self._full_at.items() if full_at > now}
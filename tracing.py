@@ -0,0 +1,157 @@
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import random
+import time
+
+# Span the running code belongs to (None outside a sampled trace)
+_current = contextvars.ContextVar("current_span", default=None)
+
+
+class Trace:
+    """One sampled operation; written out once its last span has ended"""
+
+    def __init__(self, trace_id: int):
+        self.id = trace_id
+        self.spans = []
+        self.open = 0   # running spans plus holds for work handed to other tasks
+
+
+class Span:
+    __slots__ = ("trace", "id", "parent_id", "name", "attrs", "start", "end")
+
+    def __init__(self, trace: Trace, span_id: int, parent_id, name: str, attrs: dict):
+        self.trace = trace
+        self.id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start = time.time()
+        self.end = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    """Opt-in span trees for ticket operations, sampled per root operation
+
+    trace() opens a root span for a sampled fraction of operations; span()
+    nests under whatever span is current and does nothing otherwise, so the
+    unsampled path costs one context-variable lookup. Finished traces are
+    buffered and written by flush() as JSONL (one span per line) or as
+    Chrome trace events (load the file in chrome://tracing or Perfetto).
+    """
+
+    def __init__(self, path: str, sample_rate: float, fmt: str = "jsonl"):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.fmt = fmt
+        self._ids = itertools.count(1)
+        self._pending = []
+        self.traces = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    @contextlib.contextmanager
+    def trace(self, name: str, **attrs):
+        """Root span, recorded for `sample_rate` of the calls"""
+        if not self.enabled or random.random() >= self.sample_rate:
+            yield None
+            return
+        trace = Trace(next(self._ids))
+        with self._span(trace, None, name, attrs) as span:
+            yield span
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs):
+        """Child of the current span (no-op outside a sampled trace)"""
+        parent = _current.get()
+        if parent is None:
+            yield None
+            return
+        with self._span(parent.trace, parent.id, name, attrs) as span:
+            yield span
+
+    @contextlib.contextmanager
+    def _span(self, trace: Trace, parent_id, name: str, attrs: dict):
+        span = Span(trace, next(self._ids), parent_id, name, attrs)
+        trace.spans.append(span)
+        trace.open += 1
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=type(e).__name__)
+            raise
+        finally:
+            span.end = time.time()
+            _current.reset(token)
+            self._release(trace)
+
+    def hold(self):
+        """Keep the current trace open for work another task will pick up (see resume)"""
+        span = _current.get()
+        if span is not None:
+            span.trace.open += 1
+        return span
+
+    @contextlib.contextmanager
+    def resume(self, held):
+        """Continue a held trace in this task, releasing the hold afterwards"""
+        if held is None:
+            yield
+            return
+        token = _current.set(held)
+        try:
+            yield
+        finally:
+            _current.reset(token)
+            self._release(held.trace)
+
+    def release(self, held):
+        """Drop a hold whose work will never run"""
+        if held is not None:
+            self._release(held.trace)
+
+    def _release(self, trace: Trace):
+        trace.open -= 1
+        if trace.open == 0:
+            self.traces += 1
+            self._pending.extend(self._encode(trace))
+
+    def _encode(self, trace: Trace):
+        for span in trace.spans:
+            if self.fmt == "chrome":
+                event = {
+                    'name': span.name, 'ph': "X", 'pid': 1, 'tid': trace.id,
+                    'ts': int(span.start * 1e6), 'dur': int((span.end - span.start) * 1e6),
+                    'args': span.attrs
+                }
+                yield json.dumps(event, default=str) + ","
+            else:
+                yield json.dumps({
+                    'trace_id': trace.id, 'span_id': span.id, 'parent_id': span.parent_id,
+                    'name': span.name, 'start': span.start,
+                    'duration_ms': round((span.end - span.start) * 1000, 3),
+                    'attrs': span.attrs
+                }, default=str)
+
+    async def flush(self):
+        """Append finished traces to the output file off the event loop"""
+        batch, self._pending = self._pending, []
+        if batch:
+            await asyncio.to_thread(self._write, batch)
+
+    def _write(self, lines: list):
+        new_file = not os.path.exists(self.path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            if new_file and self.fmt == "chrome":
+                f.write("[\n")  # The trace viewer accepts an unterminated event array
+            f.write("\n".join(lines) + "\n")
@@ -0,0 +1,243 @@
+import asyncio
+import json
+import os
+
+import discord
+
+# Backfilled messages buffered before they are written to the log
+BACKFILL_FLUSH_EVERY = 1000
+
+
+def message_record(message: discord.Message) -> dict:
+    """Turn a message into the plain record stored in the transcript log"""
+    return {
+        'id': message.id,
+        'ts': message.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        'author': f"{message.author.name}#{message.author.discriminator}",
+        'content': message.clean_content,
+        'attachments': [a.filename for a in message.attachments],
+        'files': attachment_records(message)
+    }
+
+def attachment_records(message: discord.Message) -> list:
+    """What the attachment archiver needs to download a message's files later"""
+    return [{'id': a.id, 'filename': a.filename, 'url': a.url, 'size': a.size} for a in message.attachments]
+
+def format_record(record: dict, archived: dict = None) -> str:
+    """Format a single message record as a transcript line
+
+    `archived` maps attachment ids to where the archived copy can be found.
+    """
+    content = record['content']
+
+    if record['attachments']:
+        names = list(record['attachments'])
+        if archived:
+            for i, file in enumerate(record.get('files', ())):
+                link = archived.get(file['id'])
+                if link and i < len(names):
+                    names[i] += f" <{link}>"
+        content += f" [Attachments: {', '.join(names)}]"
+
+    return f"[{record['ts']}] {record['author']}: {content}"
+
+
+class TranscriptLog:
+    """Append-only per-ticket message log fed by gateway events
+
+    Every ticket channel gets a JSONL file of create/edit/delete events.
+    Creates are kept in message id order so a transcript is a single
+    sequential read of the file instead of a full history replay.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._pending = {}     # channel_id -> encoded lines not yet on disk
+        self._last_id = {}     # channel_id -> newest message id in the log
+        self._held = {}        # channel_id -> live events held during a backfill
+        self._backfills = {}   # channel_id -> running backfill task
+        self._flush_lock = asyncio.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, channel_id: int) -> str:
+        return os.path.join(self.directory, f"{channel_id}.jsonl")
+
+    def _append(self, channel_id: int, event: dict):
+        self._pending.setdefault(channel_id, []).append(json.dumps(event, ensure_ascii=False))
+
+    def tracks(self, channel_id: int) -> bool:
+        """Whether live events for this channel are being captured"""
+        return channel_id in self._last_id or channel_id in self._held
+
+    def start(self, channel_id: int):
+        """Begin capturing a brand new ticket channel"""
+        self._last_id[channel_id] = 0
+
+    # ---------- live events ----------
+
+    def record_message(self, message: discord.Message):
+        channel_id = message.channel.id
+        if channel_id not in self._last_id:
+            # Log state not loaded yet (e.g. after a restart); hold the event
+            # until the gap before it has been filled from history
+            self._held.setdefault(channel_id, []).append(message_record(message))
+            self.schedule_backfill(message.channel)
+            return
+
+        if message.id <= self._last_id[channel_id]:
+            return
+
+        self._last_id[channel_id] = message.id
+        self._append(channel_id, {'op': 'create', **message_record(message)})
+
+    def record_edit(self, message: discord.Message):
+        record = message_record(message)
+        self._append(message.channel.id, {
+            'op': 'edit',
+            'id': record['id'],
+            'content': record['content'],
+            'attachments': record['attachments'],
+            'files': record['files']
+        })
+
+    def record_delete(self, channel_id: int, message_id: int):
+        self._append(channel_id, {'op': 'delete', 'id': message_id})
+
+    def record_archived(self, channel_id: int, attachment_id: int, link: str):
+        """Note where an attachment of this ticket was archived (linked from the transcript)"""
+        self._append(channel_id, {'op': 'archive', 'attachment': attachment_id, 'link': link})
+
+    # ---------- gap filling ----------
+
+    def schedule_backfill(self, channel: discord.TextChannel) -> asyncio.Task:
+        task = self._backfills.get(channel.id)
+        if task is None:
+            task = asyncio.create_task(self._backfill(channel))
+            self._backfills[channel.id] = task
+            task.add_done_callback(lambda _: self._backfills.pop(channel.id, None))
+        return task
+
+    async def backfill(self, channel: discord.TextChannel):
+        """Make sure the log holds every message up to now"""
+        if channel.id in self._last_id and channel.id not in self._backfills:
+            return
+        await self.schedule_backfill(channel)
+
+    async def _backfill(self, channel: discord.TextChannel):
+        self._held.setdefault(channel.id, [])
+        # Whatever an earlier, failed backfill fetched must be on disk before
+        # the resume point is read back from the file
+        await self.flush()
+        last_id = await asyncio.to_thread(self._read_last_id, channel.id)
+        after = discord.Object(id=last_id) if last_id else None
+
+        # Written out every BACKFILL_FLUSH_EVERY messages so memory stays flat
+        # on long channels. If history fails part way the held live events
+        # stay queued and the next backfill resumes after the last message
+        # written here.
+        fetched = 0
+        async for message in channel.history(limit=None, after=after, oldest_first=True):
+            self._append(channel.id, {'op': 'create', **message_record(message)})
+            last_id = message.id
+            fetched += 1
+            if fetched % BACKFILL_FLUSH_EVERY == 0:
+                await self.flush()
+
+        for record in self._held.pop(channel.id, []):
+            if record['id'] > last_id:
+                self._append(channel.id, {'op': 'create', **record})
+                last_id = record['id']
+        self._last_id[channel.id] = last_id
+
+    def _read_last_id(self, channel_id: int) -> int:
+        last_id = 0
+        try:
+            with open(self._path(channel_id), encoding="utf-8") as f:
+                for line in f:
+                    event = json.loads(line)
+                    if event['op'] == 'create':
+                        last_id = max(last_id, event['id'])
+        except FileNotFoundError:
+            pass
+        return last_id
+
+    # ---------- disk ----------
+
+    async def flush(self):
+        """Write buffered events to disk off the event loop"""
+        async with self._flush_lock:
+            batch, self._pending = self._pending, {}
+            if batch:
+                await asyncio.to_thread(self._write_batch, batch)
+
+    def _write_batch(self, batch: dict):
+        for channel_id, lines in batch.items():
+            with open(self._path(channel_id), "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+    def render(self, channel_id: int, write):
+        """Replay the log, calling write() once per surviving message line
+
+        Runs in two sequential passes so memory only grows with the number
+        of edited or deleted messages, not with the length of the ticket.
+        """
+        path = self._path(channel_id)
+        if not os.path.exists(path):
+            return
+
+        edits = {}
+        deleted = set()
+        archived = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                if event['op'] == 'edit':
+                    edits[event['id']] = event
+                elif event['op'] == 'delete':
+                    deleted.add(event['id'])
+                elif event['op'] == 'archive':
+                    archived[event['attachment']] = event['link']
+
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                if event['op'] != 'create' or event['id'] in deleted:
+                    continue
+                if event['id'] in edits:
+                    edit = edits[event['id']]
+                    event.update(content=edit['content'], attachments=edit['attachments'],
+                                 files=edit.get('files', event.get('files', [])))
+                write(format_record(event, archived))
+
+    def unarchived_files(self, channel_id: int) -> list:
+        """Attachments of surviving messages that have no archived copy yet"""
+        path = self._path(channel_id)
+        if not os.path.exists(path):
+            return []
+
+        files = {}   # message id -> its attachments (an edit replaces them)
+        deleted = set()
+        archived = set()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                if event['op'] in ('create', 'edit'):
+                    files[event['id']] = event.get('files', [])
+                elif event['op'] == 'delete':
+                    deleted.add(event['id'])
+                elif event['op'] == 'archive':
+                    archived.add(event['attachment'])
+        return [
+            file for message_id, message_files in files.items() if message_id not in deleted
+            for file in message_files if file['id'] not in archived
+        ]
+
+    async def discard(self, channel_id: int):
+        """Drop the log of a closed ticket"""
+        await self.flush()
+        self._last_id.pop(channel_id, None)
+        self._held.pop(channel_id, None)
+        try:
+            await asyncio.to_thread(os.remove, self._path(channel_id))
+        except FileNotFoundError:
+            pass
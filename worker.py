@@ -0,0 +1,119 @@
+"""Cloudflare Worker entry point for the HTTP interactions endpoint
+
+Set the interactions endpoint URL in the Discord developer portal to the
+Worker's URL. Secrets/vars: BOT_TOKEN, DISCORD_PUBLIC_KEY, APPLICATION_ID
+(plus GUILD_ID and the category/role/channel IDs for the default guild).
+Ticket state lives in the TICKETS KV namespace.
+"""
+import asyncio
+import json
+
+from workers import Response, WorkerEntrypoint, fetch
+
+from guild_settings import GuildSettings
+from interactions import DiscordREST, InteractionApp
+
+
+class KVStore:
+    """Ticket state in Workers KV
+
+    KV is eventually consistent and has no transactions, so two requests
+    racing on the same key (e.g. a double-click on the panel) can still
+    create two tickets; the gateway bot remains the strict option.
+    """
+
+    def __init__(self, kv):
+        self.kv = kv
+
+    async def _get(self, key: str):
+        value = await self.kv.get(key)
+        return json.loads(value) if value else None
+
+    async def _put(self, key: str, value):
+        await self.kv.put(key, json.dumps(value))
+
+    async def load_guild_settings(self, guild_id: int):
+        return await self._get(f"guild:{guild_id}")
+
+    async def get_ticket(self, channel_id: int):
+        return await self._get(f"ticket:{channel_id}")
+
+    async def channel_for_user(self, guild_id: int, user_id: int):
+        return await self._get(f"user:{guild_id}:{user_id}")
+
+    async def next_number(self, name: str) -> int:
+        number = (await self._get(f"seq:{name}") or 0) + 1
+        await self._put(f"seq:{name}", number)
+        return number
+
+    async def add_ticket(self, ticket: dict):
+        await self._put(f"ticket:{ticket['channel_id']}", ticket)
+        await self._put(f"user:{ticket['guild_id']}:{ticket['user_id']}", ticket['channel_id'])
+        counts = await self.open_counts(ticket['guild_id'])
+        counts[ticket['type']] = counts.get(ticket['type'], 0) + 1
+        await self._put(f"open:{ticket['guild_id']}", counts)
+
+    async def close_ticket(self, channel_id: int, closed_at: str, closed_by: int = None):
+        ticket = await self.get_ticket(channel_id)
+        if ticket is None:
+            return None
+        await self.kv.delete(f"ticket:{channel_id}")
+        await self.kv.delete(f"user:{ticket['guild_id']}:{ticket['user_id']}")
+        counts = await self.open_counts(ticket['guild_id'])
+        counts[ticket['type']] = max(0, counts.get(ticket['type'], 0) - 1)
+        await self._put(f"open:{ticket['guild_id']}", counts)
+        return ticket
+
+    async def open_counts(self, guild_id: int) -> dict:
+        return await self._get(f"open:{guild_id}") or {}
+
+
+async def fetch_transport(method: str, url: str, headers: dict, body: bytes):
+    response = await fetch(url, method=method, headers=headers, body=body)
+    text = await response.text()
+    return response.status, json.loads(text) if text else None
+
+
+def env_defaults(env) -> dict:
+    """Settings for GUILD_ID from Worker vars, mirroring interactions.config_defaults()"""
+    guild_id = int(getattr(env, "GUILD_ID", 0) or 0)
+    if not guild_id:
+        return {}
+    categories = {
+        key: int(getattr(env, f"{key.upper()}_CATEGORY_ID", 0) or 0)
+        for key in ("buy_skin", "donation", "pov", "general", "report_players")
+    }
+    return {
+        guild_id: GuildSettings(
+            guild_id,
+            categories=categories,
+            support_role_id=getattr(env, "SUPPORT_ROLE_ID", 0),
+            log_channel_id=getattr(env, "LOG_CHANNEL_ID", 0)
+        )
+    }
+
+
+# Built on the first request and reused while the isolate stays warm
+_app = None
+
+
+class Default(WorkerEntrypoint):
+    async def fetch(self, request):
+        global _app
+        if _app is None:
+            rest = DiscordREST(self.env.BOT_TOKEN, self.env.APPLICATION_ID, transport=fetch_transport)
+            _app = InteractionApp(self.env.DISCORD_PUBLIC_KEY, rest, KVStore(self.env.TICKETS), env_defaults(self.env))
+
+        if request.method != "POST":
+            return Response("Not found", status=404)
+
+        headers = {
+            name: request.headers.get(name) or ""
+            for name in ("X-Signature-Ed25519", "X-Signature-Timestamp")
+        }
+        body = (await request.text()).encode()
+        status, payload, job = await _app.handle(headers, body)
+        if job is not None:
+            # Runs after the response is sent; the isolate stays alive until it finishes
+            self.ctx.waitUntil(asyncio.ensure_future(job))
+        return Response.json(payload, status=status)